@@ -5,23 +5,65 @@ Modes:
 - resource: fetch one primary URL (+ optional corroborating URLs), classify/update group,
   and write a research-style README note.
 - topic: create/update a dossier for a roadmap topic using provided source URLs.
+- batch: run either mode for every line of a URL list or JSONL manifest in one process.
+- watch: keep running and ingest links as they are added to the inbox or a queue file.
+- search: BM25 full-text search over the vault's notes.
+- rebuild: regenerate every Knowledge Index and the MOC dossier links from the notes on disk.
+- resynthesize: rewrite every note from the snapshot pack of parsed sources, without fetching.
 """
 
 from __future__ import annotations
 
 import argparse
+import array
+import codecs
+import base64
+import cProfile
 import datetime as dt
+import hashlib
+import http.client
+import io
 import json
+import math
+import mmap
+import multiprocessing
+import os
+import posixpath
+import pstats
+import queue
+import random
 import re
+import shlex
+import signal
+import socket
 import ssl
+import struct
+import sys
+import threading
+import time
 import urllib.error
 import urllib.parse
 import urllib.request
-from dataclasses import dataclass
+import xml.etree.ElementTree as ET
+import zlib
+from collections import Counter
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field, replace
 from html import unescape
 from html.parser import HTMLParser
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, NoReturn, Optional, Sequence, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows: vault flushes run unlocked
+    fcntl = None  # type: ignore[assignment]
+
+try:
+    import numpy as np
+except ImportError:  # classification falls back to the keyword tables alone
+    np = None  # type: ignore[assignment]
 
 ROOT = Path(__file__).resolve().parents[1]
 TODAY = dt.date.today().isoformat()
@@ -29,6 +71,25 @@ ENTRY_RE = re.compile(
     r"^- \[ \] \[(?P<title>.+?)\]\((?P<path>.+?)\) - level: (?P<level>[a-z]+) - source: (?P<source>\S+?)(?: - citations: (?P<citations>\d+))?$"
 )
 HTML_TAG_RE = re.compile(r"<[^>]+>")
+FRONTMATTER_RE = re.compile(r"\A---\n(?P<body>.*?)\n---\n", re.S)
+# Bump when build_note_content output changes so fingerprints force a rewrite.
+NOTE_FORMAT_VERSION = "1"
+SIGNATURE_TOKEN_RE = re.compile(r"[a-z]{4,}")
+SKETCH_SIZE = 3
+MAX_CANDIDATE_SENTENCES = 5000
+NEAR_DUPLICATE_THRESHOLD = 0.8
+NOTE_SKETCH_SIZE = 64
+NOTE_DUPLICATE_THRESHOLD = 0.5
+USER_AGENT = "Mozilla/5.0 (knowledge-ingestor)"
+CACHE_DIR = ROOT / ".cache"
+CACHE_MODES = ("use", "refresh", "offline", "off")
+HTML_CONTENT_TYPES = {"text/html", "application/xhtml+xml"}
+STREAM_CHUNK_SIZE = 64 * 1024
+PAGE_MAX_BYTES = 5 * 1024 * 1024
+TITLE_PEEK_BYTES = 64 * 1024
+ARXIV_API = "https://export.arxiv.org/api/query"
+ARXIV_BATCH_SIZE = 50
+ATOM_NS = {"atom": "http://www.w3.org/2005/Atom", "arxiv": "http://arxiv.org/schemas/atom"}
 
 NOISE_PATTERNS = [
     "javascript is disabled",
@@ -81,15 +142,174 @@ class GroupConfig:
 
 
 @dataclass
+class ArxivEntry:
+    arxiv_id: str
+    title: str
+    summary: str
+    authors: List[str]
+    categories: List[str]
+    published: str
+    updated: str
+
+
+class TextBlocks:
+    """An immutable sequence of text blocks stored as one string plus an offset per block.
+
+    A list of strings costs a pointer and a ~50 byte object header per block on top of the
+    text; here each block costs one ``int32`` end offset into ``_text``. Blocks of
+    ``SHARE_MIN_CHARS`` to ``SHARE_MAX_CHARS`` that recur across pages (navigation, footers,
+    cookie banners) are shared instead of copied: the hash of each block is remembered in its
+    slot of ``_seen``, a block whose hash is already there is promoted to ``_common``, and a
+    record keeps an empty span for it and references the common copy from ``_shared`` by
+    position. Only hashes of one-off blocks are kept and ``_common`` is bounded by count and
+    length, so the process-wide state stays small for a long-running watch. Threads share the
+    tables without a lock; a lost update only means a block is copied instead of shared.
+    """
+
+    __slots__ = ("_text", "_spans", "_shared")
+
+    SHARE_MIN_CHARS = 24
+    SHARE_MAX_CHARS = 512
+    COMMON_LIMIT = 4096
+    _seen = array.array("q", [0]) * 4096
+    _common: Dict[str, str] = {}
+    _NOT_SHARED: Dict[int, str] = {}
+
+    def __init__(self, blocks: Iterable[str] = ()) -> None:
+        text: List[str] = []
+        spans = array.array("i")
+        shared: Dict[int, str] = {}
+        end = 0
+        seen, common = self._seen, self._common
+        for position, block in enumerate(blocks):
+            if self.SHARE_MIN_CHARS <= len(block) <= self.SHARE_MAX_CHARS:
+                copy = common.get(block)
+                if copy is None:
+                    digest = hash(block)
+                    slot = digest & (len(seen) - 1)
+                    if seen[slot] == digest:
+                        if len(common) >= self.COMMON_LIMIT:
+                            common.clear()
+                        copy = common[block] = block
+                    else:
+                        seen[slot] = digest
+                if copy is not None:
+                    spans.append(end)
+                    shared[position] = copy
+                    continue
+            text.append(block)
+            end += len(block)
+            spans.append(end)
+        self._text = "".join(text)
+        self._spans = spans
+        self._shared = shared or self._NOT_SHARED
+
+    @classmethod
+    def of(cls, blocks: Iterable[str]) -> "TextBlocks":
+        return blocks if isinstance(blocks, TextBlocks) else cls(blocks)
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+    def __iter__(self) -> Iterator[str]:
+        text, shared = self._text, self._shared
+        start = 0
+        for position, end in enumerate(self._spans):
+            yield shared[position] if start == end and position in shared else text[start:end]
+            start = end
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        spans = self._spans
+        if index < 0:
+            index += len(spans)
+        if not 0 <= index < len(spans):
+            raise IndexError("TextBlocks index out of range")
+        start = spans[index - 1] if index else 0
+        end = spans[index]
+        if start == end and index in self._shared:
+            return self._shared[index]
+        return self._text[start:end]
+
+    def __contains__(self, block: object) -> bool:
+        return any(block == item for item in self)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (TextBlocks, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"TextBlocks({list(self)!r})"
+
+
+@dataclass(slots=True)
 class SourceRecord:
+    """Everything extracted from one source; block lists are stored as ``TextBlocks``."""
+
     url: str
     title: str
     description: str
-    headings: List[str]
-    paragraphs: List[str]
-    list_items: List[str]
+    headings: Sequence[str]
+    paragraphs: Sequence[str]
+    list_items: Sequence[str]
     access_limited: bool
     oembed_info: Optional[Dict[str, str]]
+    arxiv: Optional[ArxivEntry] = None
+    fetch_error: Optional[BaseException] = field(default=None, repr=False, compare=False)
+    # extract_content_sentences() of the fields above when a parse worker already ran it
+    sentences: Optional[Sequence[str]] = field(default=None, repr=False, compare=False)
+    # source_fingerprint(), kept once the blocks it covers have been dropped
+    fingerprint: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.headings = TextBlocks.of(self.headings)
+        self.paragraphs = TextBlocks.of(self.paragraphs)
+        self.list_items = TextBlocks.of(self.list_items)
+        if self.sentences is not None:
+            self.sentences = TextBlocks.of(self.sentences)
+        if self.oembed_info:
+            # provider and author strings repeat across every post from the same account
+            self.oembed_info = {key: sys.intern(value) if len(value) < 200 else value for key, value in self.oembed_info.items()}
+
+    def drop_blocks(self) -> None:
+        """Free the paragraphs and list items once sentences have been extracted from them.
+
+        The sentences and the fingerprint are kept. Records whose sentences were never extracted
+        (by a parse worker or for a note) stay whole: extracting them here would spend main
+        thread time to free about as much text as the sentences take. A shrunk record still
+        serves as a corroborating source, but can no longer be classified or snapshotted as a
+        primary one.
+        """
+        if self.fingerprint is not None or self.sentences is None:
+            return
+        self.fingerprint = source_fingerprint(self)
+        self.paragraphs = self.list_items = TextBlocks()
+
+
+@dataclass
+class HttpResponse:
+    url: str
+    status: int
+    body: bytes
+    charset: Optional[str]
+    content_type: str = ""
+    complete: bool = True
+
+
+@dataclass
+class IngestResult:
+    url: str
+    action: str
+    group: str
+    level: str
+    kind: str
+    note_path: Path
+    citations: int
+    warnings: List[str] = field(default_factory=list)
 
 
 GROUPS: Dict[str, GroupConfig] = {
@@ -176,6 +396,10 @@ LEVEL_KEYWORDS = {
 
 
 class PageParser(HTMLParser):
+    MAX_HEADINGS = 30
+    MAX_PARAGRAPHS = 100
+    MAX_LIST_ITEMS = 120
+
     def __init__(self) -> None:
         super().__init__(convert_charrefs=True)
         self._capture_tag: str | None = None
@@ -213,21 +437,89 @@ class PageParser(HTMLParser):
 
         if tag == "title" and not self.title:
             self.title = text
-        elif tag in {"h1", "h2", "h3"} and len(self.headings) < 30:
+        elif tag in {"h1", "h2", "h3"} and len(self.headings) < self.MAX_HEADINGS:
             self.headings.append(text)
-        elif tag == "p" and len(self.paragraphs) < 100:
+        elif tag == "p" and len(self.paragraphs) < self.MAX_PARAGRAPHS:
             self.paragraphs.append(text)
-        elif tag == "li" and len(self.list_items) < 120:
+        elif tag == "li" and len(self.list_items) < self.MAX_LIST_ITEMS:
             self.list_items.append(text)
 
         self._capture_tag = None
         self._buffer = []
 
+    @property
+    def saturated(self) -> bool:
+        """True once every capped collection is full, so later markup cannot change the result."""
+        return (
+            len(self.headings) >= self.MAX_HEADINGS
+            and len(self.paragraphs) >= self.MAX_PARAGRAPHS
+            and len(self.list_items) >= self.MAX_LIST_ITEMS
+        )
+
+
+class PageStream:
+    """Decodes response chunks incrementally and feeds them to a PageParser as they arrive.
+
+    Reading continues until ``until(parser)`` is true; by default that is parser saturation.
+    """
+
+    def __init__(self, parser: Optional[PageParser] = None, until: Optional[Callable[[PageParser], bool]] = None) -> None:
+        self.parser = parser or PageParser()
+        self.until = until or (lambda parser: parser.saturated)
+        self._decoder: Optional[codecs.IncrementalDecoder] = None
+
+    def __call__(self, chunk: bytes, charset: Optional[str]) -> bool:
+        if self._decoder is None:
+            try:
+                factory = codecs.getincrementaldecoder(charset or "utf-8")
+            except LookupError:
+                factory = codecs.getincrementaldecoder("utf-8")
+            self._decoder = factory(errors="replace")
+        self.parser.feed(self._decoder.decode(chunk))
+        return not self.until(self.parser)
+
+    def close(self) -> PageParser:
+        if self._decoder is not None:
+            self.parser.feed(self._decoder.decode(b"", final=True))
+        self.parser.close()
+        return self.parser
+
+
+@dataclass
+class ParsedPage:
+    title: str
+    description: str
+    headings: List[str]
+    paragraphs: List[str]
+    list_items: List[str]
+    sentences: Optional[List[str]] = None
+    # the bytes the page was parsed from, kept for the snapshot pack
+    html: bytes = field(default=b"", repr=False)
+    charset: Optional[str] = None
+
+    @classmethod
+    def from_parser(cls, parser: PageParser) -> "ParsedPage":
+        return cls(parser.title, parser.description, parser.headings, parser.paragraphs, parser.list_items)
+
+
+class ContentTypeError(ValueError):
+    pass
+
+
+class OfflineMissError(urllib.error.URLError):
+    """A response was needed but offline mode has no cached copy or fixture for it."""
+
+
+SENTENCE_BOUNDARY_RE = re.compile(r"(?<=[.!?])\s+")
+
 
 def clean_text(raw: str) -> str:
-    text = unescape(raw)
-    text = re.sub(r"\s+", " ", text)
-    return text.strip()
+    # str.split() breaks on exactly the characters ``\s`` matches; unescape returns early without "&"
+    return " ".join(unescape(raw).split())
+
+
+def clean_texts(raws: Iterable[str]) -> List[str]:
+    return [" ".join(unescape(raw).split()) for raw in raws]
 
 
 def slugify(text: str) -> str:
@@ -258,48 +550,115 @@ def derive_title_from_url(parsed: urllib.parse.ParseResult) -> str:
 
 
 def is_noise(text: str) -> bool:
-    lower = text.lower()
-    return any(pattern in lower for pattern in NOISE_PATTERNS)
+    return is_noise_lower(text.lower())
+
+
+def is_noise_lower(lower: str) -> bool:
+    # a loop of substring scans measured faster than one alternation or trie regex, even on long blocks
+    for pattern in NOISE_PATTERNS:
+        if pattern in lower:
+            return True
+    return False
+
+
+def normalize_blocks(blocks: Iterable[str]) -> List[Tuple[str, str]]:
+    """Clean each text block once and pair it with its lowercase form; empty and noise blocks are dropped."""
+    normalized: List[Tuple[str, str]] = []
+    for block in blocks:
+        text = " ".join(unescape(block).split()) if block else ""
+        if not text:
+            continue
+        lower = text.lower()
+        if not is_noise_lower(lower):
+            normalized.append((text, lower))
+    return normalized
 
 
 def split_sentences(text: str) -> List[str]:
-    parts = re.split(r"(?<=[.!?])\s+", text.strip())
-    return [clean_text(p) for p in parts if clean_text(p)]
+    return [part for part in SENTENCE_BOUNDARY_RE.split(clean_text(text)) if part]
 
 
 def extract_content_sentences(description: str, paragraphs: List[str], list_items: List[str]) -> List[str]:
+    """Distinct (case-insensitively) prose sentences of a page's blocks, in page order.
+
+    Noise patterns never span a sentence boundary, so a block that passes the noise check has no
+    noisy sentence; lowercasing keeps the boundaries, so each sentence's dedup key comes from
+    splitting the block's lowercase form the same way.
+    """
     sentences: List[str] = []
-    for block in [description, *paragraphs, *list_items]:
-        if not block or is_noise(block):
-            continue
-        for sentence in split_sentences(block):
-            if len(sentence) < 35 or len(sentence) > 360:
-                continue
-            if is_noise(sentence) or sentence.endswith(":"):
+    seen = set()
+    for text, lower in normalize_blocks([description, *paragraphs, *list_items]):
+        for sentence, key in zip(SENTENCE_BOUNDARY_RE.split(text), SENTENCE_BOUNDARY_RE.split(lower)):
+            if len(sentence) < 35 or len(sentence) > 360 or sentence.endswith(":") or sentence.count("#") > 1:
                 continue
-            if sentence.count("#") > 1:
+            if key in seen:
                 continue
+            seen.add(key)
             sentences.append(sentence)
+    return sentences
 
-    deduped: List[str] = []
-    seen = set()
-    for sentence in sentences:
-        key = sentence.lower()
-        if key in seen:
-            continue
-        seen.add(key)
-        deduped.append(sentence)
-    return deduped
 
+def sentence_signature(sentence: str) -> FrozenSet[int]:
+    """CRC32 hashes of the sentence's 4+ letter words; stable across runs, unlike ``hash()``."""
+    return frozenset(zlib.crc32(token.encode("utf-8")) for token in SIGNATURE_TOKEN_RE.findall(sentence.lower()))
+
+
+class SentencePool:
+    """Bounded pool of candidate sentences with near-duplicate suppression.
+
+    Each sentence is indexed under the smallest values of its hashed token set (a bottom-k
+    MinHash sketch). Near-duplicates share those minima with high probability, so a new sentence
+    is only compared with the few pooled sentences it collides with, not the whole pool.
+    """
+
+    BUCKET_LIMIT = 64
+
+    def __init__(self, threshold: Optional[float] = None, limit: int = MAX_CANDIDATE_SENTENCES) -> None:
+        self.threshold = NEAR_DUPLICATE_THRESHOLD if threshold is None else threshold
+        self.limit = limit
+        self.sentences: List[str] = []
+        self.signatures: List[FrozenSet[int]] = []
+        self._buckets: Dict[int, List[int]] = {}
+
+    def add(self, sentence: str) -> bool:
+        if len(self.sentences) >= self.limit:
+            return False
+        signature = sentence_signature(sentence)
+        if not signature:
+            return False
+        sketch = sorted(signature)[:SKETCH_SIZE]
+        for idx in {idx for value in sketch for idx in self._buckets.get(value, ())}:
+            other = self.signatures[idx]
+            if len(signature & other) / len(signature | other) >= self.threshold:
+                return False
+        position = len(self.sentences)
+        self.sentences.append(sentence)
+        self.signatures.append(signature)
+        for value in sketch:
+            bucket = self._buckets.setdefault(value, [])
+            bucket.append(position)
+            if len(bucket) > self.BUCKET_LIMIT:
+                # a very common token would otherwise turn lookups linear; keep the newest entries
+                del bucket[0]
+        return True
+
+    def extend(self, sentences: Iterable[str]) -> None:
+        for sentence in sentences:
+            if len(self.sentences) >= self.limit:
+                return
+            self.add(sentence)
 
-def pick_distinct_sentences(sentences: List[str], count: int) -> List[str]:
+
+def pick_distinct_sentences(
+    sentences: List[str], count: int, signatures: Optional[List[FrozenSet[int]]] = None
+) -> List[str]:
     picked: List[str] = []
-    seen_tokens: set[str] = set()
-    for sentence in sentences:
-        tokens = set(re.findall(r"[a-z]{4,}", sentence.lower()))
+    seen_tokens: set[int] = set()
+    for position, sentence in enumerate(sentences):
+        tokens = signatures[position] if signatures is not None else sentence_signature(sentence)
         if not tokens:
             continue
-        overlap = len(tokens & seen_tokens) / max(len(tokens), 1)
+        overlap = len(tokens & seen_tokens) / len(tokens)
         if overlap > 0.65:
             continue
         picked.append(sentence)
@@ -309,325 +668,2697 @@ def pick_distinct_sentences(sentences: List[str], count: int) -> List[str]:
     return picked
 
 
-def fetch_page(url: str) -> str:
-    req = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0 (knowledge-ingestor)"})
-    for _ in range(2):
+class Tracer:
+    """Collects timed spans (name, category, wall time, per-span attributes) for ``--trace``.
+
+    Spans are recorded from every thread; with no trace path configured ``span`` yields a
+    throwaway dict and records nothing. ``write`` emits JSON lines or a Chrome trace file
+    (``chrome://tracing`` / Perfetto).
+    """
+
+    def __init__(self) -> None:
+        self.path: Optional[Path] = None
+        self.format = "jsonl"
+        self._events: List[Tuple[str, str, float, float, int, Dict[str, object]]] = []
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def add(self, name: str, category: str, start: float, end: float, **attrs: object) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            self._events.append((name, category, start, end, threading.get_ident(), attrs))
+
+    @contextmanager
+    def span(self, name: str, category: str = "stage", **attrs: object) -> Iterator[Dict[str, object]]:
+        """Time the block; callers may add attributes (bytes, status, ...) to the yielded dict."""
+        if self.path is None:
+            yield attrs
+            return
+        start = time.perf_counter()
         try:
-            with urllib.request.urlopen(req, timeout=30) as resp:
-                charset = resp.headers.get_content_charset() or "utf-8"
-                return resp.read().decode(charset, errors="replace")
-        except urllib.error.URLError as exc:
-            reason = getattr(exc, "reason", None)
-            if isinstance(reason, ssl.SSLCertVerificationError):
-                insecure_ctx = ssl.create_default_context()
-                insecure_ctx.check_hostname = False
-                insecure_ctx.verify_mode = ssl.CERT_NONE
-                with urllib.request.urlopen(req, timeout=30, context=insecure_ctx) as resp:
-                    charset = resp.headers.get_content_charset() or "utf-8"
-                    return resp.read().decode(charset, errors="replace")
-            last = exc
-    raise last  # type: ignore[name-defined]
+            yield attrs
+        except BaseException as exc:
+            attrs["error"] = f"{type(exc).__name__}: {exc}"[:300]
+            raise
+        finally:
+            self.add(name, category, start, time.perf_counter(), **attrs)
 
+    def write(self, counters: Optional[Dict[str, object]] = None) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            events = sorted(self._events, key=lambda event: event[2])
+            self._events = []
+        pid = os.getpid()
+        if self.format == "chrome":
+            trace = [
+                {
+                    "name": name,
+                    "cat": category,
+                    "ph": "X",
+                    "ts": round((start - self._origin) * 1e6, 1),
+                    "dur": round((end - start) * 1e6, 1),
+                    "pid": pid,
+                    "tid": thread,
+                    "args": attrs,
+                }
+                for name, category, start, end, thread, attrs in events
+            ]
+            if counters:
+                end_ts = round((time.perf_counter() - self._origin) * 1e6, 1)
+                trace.append({"name": "counters", "ph": "C", "ts": end_ts, "pid": pid, "tid": 0, "args": counters})
+            payload = json.dumps({"traceEvents": trace, "displayTimeUnit": "ms"}, default=str)
+        else:
+            lines = [
+                json.dumps(
+                    {
+                        "name": name,
+                        "cat": category,
+                        "start_ms": round((start - self._origin) * 1000, 3),
+                        "dur_ms": round((end - start) * 1000, 3),
+                        "thread": thread,
+                        **attrs,
+                    },
+                    default=str,
+                )
+                for name, category, start, end, thread, attrs in events
+            ]
+            if counters:
+                lines.append(json.dumps({"name": "counters", "cat": "summary", **counters}, default=str))
+            payload = "\n".join(lines)
+        write_bytes_atomic(self.path, (payload + "\n").encode("utf-8"))
 
-def fetch_x_oembed(url: str) -> Optional[Dict[str, str]]:
-    endpoint = "https://publish.twitter.com/oembed?url=" + urllib.parse.quote(url, safe="")
-    try:
-        req = urllib.request.Request(endpoint, headers={"User-Agent": "Mozilla/5.0 (knowledge-ingestor)"})
-        raw = urllib.request.urlopen(req, timeout=30).read().decode("utf-8", errors="replace")
-        data = json.loads(raw)
-    except Exception:
-        return None
 
-    html = clean_text(data.get("html", ""))
-    text = clean_text(HTML_TAG_RE.sub(" ", html))
-    return {
-        "author_name": clean_text(data.get("author_name", "")),
-        "author_url": clean_text(data.get("author_url", "")),
-        "provider_name": clean_text(data.get("provider_name", "")),
-        "embed_text": text,
-    }
+TRACER = Tracer()
 
 
-def arxiv_id_from_url(url: str) -> str:
-    parsed = urllib.parse.urlparse(url)
-    if parsed.netloc.lower() not in {"arxiv.org", "www.arxiv.org"}:
-        return ""
-    parts = [p for p in parsed.path.split("/") if p]
-    if len(parts) >= 2 and parts[0] in {"abs", "pdf"}:
-        return parts[1].replace(".pdf", "")
-    return ""
+class RunProfiler:
+    """cProfile for the main thread and every fetch worker, merged into one report.
 
+    Before Python 3.12 ``cProfile`` only sees the thread that enabled it, so each worker gets
+    its own profile from the thread pool initializer. A worker's profile is only enabled while
+    that thread runs a task (``call``), so once the pool has shut down and waited, none is
+    active and all can be merged. From 3.12 the profiler sits on ``sys.monitoring``: the main
+    thread's profile sees every thread and a second one cannot be enabled. Parse worker
+    processes (``--parse-workers``) are not profiled.
+    """
 
-def fetch_arxiv_metadata(arxiv_id: str) -> Optional[Tuple[str, str]]:
-    if not arxiv_id:
-        return None
-    endpoint = f"https://export.arxiv.org/api/query?id_list={urllib.parse.quote(arxiv_id, safe='')}"
-    try:
-        raw = urllib.request.urlopen(
-            urllib.request.Request(endpoint, headers={"User-Agent": "Mozilla/5.0 (knowledge-ingestor)"}),
-            timeout=30,
-        ).read().decode("utf-8", errors="replace")
-    except Exception:
-        return None
-    title_match = re.search(r"<title>(.*?)</title>", raw, re.S | re.I)
-    # first title in feed is generic; paper title is typically second
-    titles = re.findall(r"<title>(.*?)</title>", raw, re.S | re.I)
-    summary_match = re.search(r"<summary>(.*?)</summary>", raw, re.S | re.I)
-    if not summary_match:
-        return None
-    title = clean_text(unescape(titles[1] if len(titles) > 1 else (title_match.group(1) if title_match else "")))
-    summary = clean_text(unescape(summary_match.group(1)))
-    return title, summary
+    PER_THREAD = sys.version_info < (3, 12)
 
+    def __init__(self) -> None:
+        self.enabled = False
+        self.path: Optional[Path] = None
+        self._profiles: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
 
-def fetch_source_record(url: str) -> SourceRecord:
-    parsed = urllib.parse.urlparse(url)
-    title = derive_title_from_url(parsed)
-    description = ""
-    headings: List[str] = []
-    paragraphs: List[str] = []
-    list_items: List[str] = []
-    access_limited = False
-    oembed_info: Optional[Dict[str, str]] = None
+    def start_thread(self) -> None:
+        """Give a pool thread its profile; ``call`` enables it around each task."""
+        if not self.enabled or not self.PER_THREAD:
+            return
+        profile = cProfile.Profile()
+        with self._lock:
+            self._profiles.append(profile)
+        self._local.profile = profile
 
-    try:
-        html = fetch_page(url)
-        parser = PageParser()
-        parser.feed(html)
-        title = clean_text(parser.title) or title
-        description = clean_text(parser.description)
-        headings = parser.headings
-        paragraphs = parser.paragraphs
-        list_items = parser.list_items
-        haystack = " ".join([title, description, *paragraphs]).lower()
-        if parsed.netloc.lower() in {"x.com", "twitter.com"} and "javascript is disabled" in haystack:
-            access_limited = True
-            oembed_info = fetch_x_oembed(url)
-    except Exception:
-        access_limited = True
-        if parsed.netloc.lower() in {"x.com", "twitter.com"}:
-            oembed_info = fetch_x_oembed(url)
-
-    arxiv_id = arxiv_id_from_url(url)
-    if arxiv_id:
-        arxiv_meta = fetch_arxiv_metadata(arxiv_id)
-        if arxiv_meta:
-            arxiv_title, arxiv_summary = arxiv_meta
-            if arxiv_title:
-                title = arxiv_title
-            if arxiv_summary:
-                description = arxiv_summary
-                if arxiv_summary not in paragraphs:
-                    paragraphs = [arxiv_summary, *paragraphs]
-            access_limited = False
+    def start_main(self) -> None:
+        """Profile the main thread until ``report``; its profile comes first in the merge."""
+        profile = cProfile.Profile()
+        with self._lock:
+            self._profiles.insert(0, profile)
+        profile.enable()
 
-    return SourceRecord(
-        url=url,
-        title=title,
-        description=description,
-        headings=headings,
-        paragraphs=paragraphs,
-        list_items=list_items,
-        access_limited=access_limited,
-        oembed_info=oembed_info,
-    )
+    def call(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        profile = getattr(self._local, "profile", None)
+        if profile is None:
+            return fn(*args, **kwargs)
+        profile.enable()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profile.disable()
 
+    def report(self, limit: int = 30) -> None:
+        if not self.enabled or not self._profiles:
+            return
+        # worker profiles are only enabled inside tasks, which are all done by now (the fetch
+        # pool waits for them when profiling); only the main thread's is still running
+        self._profiles[0].disable()
+        stats = pstats.Stats(self._profiles[0], stream=sys.stderr)
+        for profile in self._profiles[1:]:
+            stats.add(profile)
+        if self.path is not None:
+            stats.dump_stats(str(self.path))
+        stats.sort_stats("cumulative").print_stats(limit)
+        self._profiles = []
+        self.enabled = False
 
-def classify_group(text: str) -> str:
-    haystack = text.lower()
-    scores: Dict[str, int] = {}
-    for group, keywords in GROUP_KEYWORDS.items():
-        scores[group] = sum(haystack.count(keyword) for keyword in keywords)
 
-    best_group, best_score = max(scores.items(), key=lambda item: item[1])
-    return best_group if best_score > 0 else "ai"
+PROFILER = RunProfiler()
 
 
-def classify_level(text: str) -> str:
-    haystack = text.lower()
-    scores: Dict[str, int] = {}
-    for level, keywords in LEVEL_KEYWORDS.items():
-        scores[level] = sum(haystack.count(keyword) for keyword in keywords)
+class ProfiledThreadPool(ThreadPoolExecutor):
+    """Thread pool whose tasks run under their worker's ``PROFILER`` profile."""
 
-    best_level, best_score = max(scores.items(), key=lambda item: item[1])
-    return best_level if best_score > 0 else "intermediate"
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future:  # type: ignore[override]
+        return super().submit(PROFILER.call, fn, *args, **kwargs)
 
 
-def unique_note_dir(base_dir: Path, slug: str) -> Path:
-    candidate = base_dir / slug
-    if not candidate.exists():
-        return candidate
+class HostThrottle:
+    """Caps in-flight requests per host and spaces out request starts to the same host."""
 
-    i = 2
-    while True:
-        candidate = base_dir / f"{slug}-{i}"
-        if not candidate.exists():
-            return candidate
-        i += 1
+    def __init__(
+        self,
+        per_host: int = 2,
+        min_delay: float = 0.25,
+        host_limits: Optional[Dict[str, Tuple[int, float]]] = None,
+    ) -> None:
+        self.per_host = per_host
+        self.min_delay = min_delay
+        # hosts with published rate limits get their own (concurrency, delay) pair
+        self.host_limits = host_limits or {}
+        self._lock = threading.Lock()
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._next_start: Dict[str, float] = {}
 
+    @contextmanager
+    def slot(self, url: str) -> Iterator[None]:
+        host = urllib.parse.urlparse(url).netloc.lower()
+        per_host, min_delay = self.host_limits.get(host, (self.per_host, self.min_delay))
+        with self._lock:
+            semaphore = self._slots.setdefault(host, threading.BoundedSemaphore(max(per_host, 1)))
+        with semaphore:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start.get(host, 0.0))
+                self._next_start[host] = start + min_delay
+            if start > now:
+                time.sleep(start - now)
+            yield
 
-def ensure_knowledge_index(group: str, cfg: GroupConfig) -> None:
-    index_path = ROOT / cfg.knowledge_index
-    index_path.parent.mkdir(parents=True, exist_ok=True)
-    if index_path.exists():
-        return
 
-    title = f"{group.title()} Knowledge Index"
-    content = "\n".join(
-        [
-            "---",
-            f"created: {TODAY}",
-            f"updated: {TODAY}",
-            f"tags: [{cfg.domain}, knowledge, index]",
-            f"domain: {cfg.domain}",
-            "status: active",
-            "---",
-            "",
-            f"# {title}",
-            "",
-            f"- [[{cfg.group_index.with_suffix('').as_posix()}]]",
-            f"- [[{cfg.moc.with_suffix('').as_posix()}]]",
-            "",
-            "## Entries",
-            "",
-        ]
-    )
-    index_path.write_text(content, encoding="utf-8")
+# arXiv asks API clients for one request every three seconds on a single connection.
+HOST_THROTTLE = HostThrottle(host_limits={"export.arxiv.org": (1, 3.0)})
 
 
-def find_existing_entry_by_source(source_url: str) -> Optional[Tuple[str, GroupConfig, Path, str, str, int]]:
-    for group, cfg in GROUPS.items():
-        index_path = ROOT / cfg.knowledge_index
-        if not index_path.exists():
-            continue
-        lines = index_path.read_text(encoding="utf-8").splitlines()
-        for line in lines:
-            match = ENTRY_RE.match(line.strip())
-            if not match:
-                continue
-            if match.group("source").strip() != source_url:
-                continue
-            rel_path = Path(match.group("path"))
-            note_path = (index_path.parent / rel_path).resolve()
-            citations_raw = match.group("citations")
-            citations = int(citations_raw) if citations_raw else 0
-            return (group, cfg, note_path, match.group("title"), match.group("level"), citations)
-    return None
+def write_bytes_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
 
 
-def upsert_knowledge_index_entry(
-    cfg: GroupConfig,
-    title: str,
-    note_dir: Path,
-    level: str,
-    source_url: str,
-    citations_count: int,
-) -> None:
-    index_path = ROOT / cfg.knowledge_index
-    rel = note_dir.relative_to(index_path.parent)
-    line = (
-        f"- [ ] [{title}]({rel.as_posix()}/README.md) - level: {level} "
-        f"- source: {source_url} - citations: {citations_count}"
-    )
+class HttpCache:
+    """On-disk response cache with validator-based revalidation.
 
-    lines = index_path.read_text(encoding="utf-8").splitlines()
-    replaced = False
-    new_lines: List[str] = []
-    for current in lines:
-        match = ENTRY_RE.match(current.strip())
-        if match and match.group("source").strip() == source_url:
-            new_lines.append(line)
-            replaced = True
-        else:
-            new_lines.append(current)
+    Bodies are stored content-addressed under ``blobs/`` (identical responses share one file);
+    per-URL metadata (charset, ETag, Last-Modified, fetch time) lives under ``meta/``. The meta
+    file mtime doubles as the LRU clock and is bumped on every hit.
 
-    updated = "\n".join(new_lines).rstrip()
-    if not replaced:
-        if "## Entries" not in updated:
-            updated = updated + "\n\n## Entries\n"
-        updated = updated + "\n" + line
+    Modes: ``use`` serves fresh entries and revalidates stale ones, ``refresh`` re-downloads
+    everything, ``offline`` never touches the network, ``off`` bypasses the cache.
+    """
 
-    index_path.write_text(updated + "\n", encoding="utf-8")
+    def __init__(self, root: Path, mode: str = "use", ttl: float = 7 * 86400, max_bytes: int = 512 * 1024 * 1024) -> None:
+        self.root = root
+        self.mode = mode
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.stats: Dict[str, int] = {"hit": 0, "revalidated": 0, "downloaded": 0}
+        self._lock = threading.Lock()
 
+    def _meta_path(self, url: str) -> Path:
+        return self.root / "meta" / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json"
 
-def build_bibliography(records: List[SourceRecord], min_citations: int) -> List[Tuple[str, str]]:
-    items: List[Tuple[str, str]] = []
-    seen = set()
-    for rec in records:
-        url = rec.url
-        if url in seen:
-            continue
-        seen.add(url)
-        title = rec.title or urllib.parse.urlparse(url).netloc
-        items.append((title, url))
+    def _blob_path(self, digest: str) -> Path:
+        return self.root / "blobs" / digest[:2] / digest
 
-    if len(items) < min_citations:
-        raise ValueError(
-            f"Need at least {min_citations} citations but only {len(items)} sources available. "
-            "Add more --extra-source entries."
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def lookup(self, url: str) -> Optional[Dict[str, object]]:
+        meta_path = self._meta_path(url)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if meta.get("url") != url or not self._blob_path(str(meta["digest"])).exists():
+            return None
+        return meta
+
+    def is_fresh(self, meta: Dict[str, object]) -> bool:
+        return time.time() - float(meta.get("fetched_at", 0)) < self.ttl
+
+    def serve(self, meta: Dict[str, object], revalidated: bool = False) -> HttpResponse:
+        url = str(meta["url"])
+        meta_path = self._meta_path(url)
+        if revalidated:
+            meta["fetched_at"] = time.time()
+            write_bytes_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+            self._count("revalidated")
+        else:
+            os.utime(meta_path)
+            self._count("hit")
+        body = self._blob_path(str(meta["digest"])).read_bytes()
+        return HttpResponse(
+            url=url,
+            status=200,
+            body=body,
+            charset=meta.get("charset"),  # type: ignore[arg-type]
+            content_type=str(meta.get("content_type") or ""),
+            complete=bool(meta.get("complete", True)),
         )
-    return items
 
+    def store(self, resp: HttpResponse, etag: Optional[str], last_modified: Optional[str]) -> None:
+        self._count("downloaded")
+        digest = hashlib.sha256(resp.body).hexdigest()
+        blob_path = self._blob_path(digest)
+        if not blob_path.exists():
+            write_bytes_atomic(blob_path, resp.body)
+        meta = {
+            "url": resp.url,
+            "digest": digest,
+            "size": len(resp.body),
+            "charset": resp.charset,
+            "content_type": resp.content_type,
+            "complete": resp.complete,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": time.time(),
+        }
+        write_bytes_atomic(self._meta_path(resp.url), json.dumps(meta).encode("utf-8"))
 
-def build_note_content(
-    cfg: GroupConfig,
-    title: str,
-    level: str,
-    primary: SourceRecord,
-    bibliography: List[Tuple[str, str]],
-    kind: str,
-    topic_id: str,
-) -> str:
-    records = [primary]
-    for src_title, src_url in bibliography[1:]:
-        records.append(SourceRecord(src_url, src_title, "", [], [], [], False, None))
+    def prune(self) -> int:
+        """Evict least-recently-used entries until blobs fit in ``max_bytes``; returns entries removed."""
+        meta_dir = self.root / "meta"
+        if not meta_dir.exists():
+            return 0
+        entries: List[Tuple[float, Path, str]] = []
+        for meta_path in meta_dir.glob("*.json"):
+            try:
+                meta = json.loads(meta_path.read_text(encoding="utf-8"))
+                entries.append((meta_path.stat().st_mtime, meta_path, str(meta["digest"])))
+            except (OSError, ValueError, KeyError):
+                meta_path.unlink(missing_ok=True)
 
-    all_sentences: List[str] = []
-    for rec in records:
-        all_sentences.extend(extract_content_sentences(rec.description, rec.paragraphs, rec.list_items))
-    selected = pick_distinct_sentences(all_sentences, 18)
-    level_article = "an" if level[:1].lower() in {"a", "e", "i", "o", "u"} else "a"
+        blob_sizes: Dict[str, int] = {}
+        for blob_path in (self.root / "blobs").glob("*/*"):
+            blob_sizes[blob_path.name] = blob_path.stat().st_size
+        referenced: Dict[str, int] = {}
+        for _, _, digest in entries:
+            referenced[digest] = referenced.get(digest, 0) + 1
 
-    def synth(start: int, take: int, fallback: str) -> str:
-        chunk = selected[start : start + take]
-        if chunk:
-            return " ".join(chunk)
-        return fallback
+        total = sum(size for digest, size in blob_sizes.items() if digest in referenced)
+        removed = 0
+        for _, meta_path, digest in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            meta_path.unlink(missing_ok=True)
+            removed += 1
+            referenced[digest] -= 1
+            if referenced[digest] == 0:
+                total -= blob_sizes.get(digest, 0)
 
-    if primary.access_limited:
-        embed_text = (primary.oembed_info or {}).get("embed_text", "")
-        author = (primary.oembed_info or {}).get("author_name", "")
-        provider = (primary.oembed_info or {}).get("provider_name", "the platform")
+        for digest in blob_sizes:
+            if not referenced.get(digest):
+                self._blob_path(digest).unlink(missing_ok=True)
+        return removed
 
-        abstract = (
-            "This note preserves a source that is partially inaccessible to static scraping. "
-            f"It is still documented as {level_article} {level}-level {kind} entry in the `{cfg.domain}` track."
-        )
-        context = (
-            f"The primary source requires dynamic rendering, so the research pass relies on metadata and corroborating citations. "
-            f"Available platform metadata indicates authorship by {author or 'an identified account'} on {provider}."
-        )
-        method = (
-            "Synthesis was built by combining recoverable metadata with corroborating technical sources listed in the bibliography. "
-            "This maintains traceability while avoiding fabricated details."
-        )
-        findings = (
-            f"Recoverable metadata from the primary source: {embed_text}. "
-            "Corroborating references were used to anchor broader interpretation and follow-up analysis."
-        )
-        critique = (
-            "Evidence quality is lower when the primary source is dynamically gated. "
-            "Treat this as a directional research node and enrich manually with verbatim source text when available."
-        )
-    else:
-        heading_overview = ", ".join([h for h in primary.headings if not is_noise(h)][:4])
-        abstract = (
-            f"{primary.description or synth(0, 2, 'This resource presents a technical perspective relevant to this track.')} "
-            f"This dossier treats the material as {level_article} {level}-level knowledge and cross-checks it against corroborating sources."
-        )
-        context = (
-            f"The source frames the problem around {heading_overview or 'practical system constraints and design decisions'}. "
-            f"{synth(1, 2, 'The central challenge is balancing capability, reliability, and cost under real operating constraints.')}"
+
+HTTP_CACHE = HttpCache(CACHE_DIR / "http")
+REDIRECT_CODES = {301, 302, 303, 307, 308}
+
+
+# (scheme, host, port, verify, proxy URL or "")
+PoolKey = Tuple[str, str, int, bool, str]
+
+
+class ConnectionPool:
+    """Keep-alive HTTP(S) connections shared by every fetch in the process.
+
+    Idle connections are parked per (scheme, host, port, verify, proxy) and handed back out to
+    the next request for the same origin, so repeated hosts skip the TCP/TLS handshake. SSL
+    contexts are built once per verification mode. Proxies are taken from the environment
+    like ``urlopen`` does (``HTTP_PROXY``, ``HTTPS_PROXY``, ``NO_PROXY``): plain HTTP is sent to
+    the proxy with the absolute URL and HTTPS is tunnelled through it with ``CONNECT``.
+    """
+
+    def __init__(self, max_idle_per_host: int = 4) -> None:
+        self.max_idle_per_host = max_idle_per_host
+        self._lock = threading.Lock()
+        self._idle: Dict[PoolKey, List[http.client.HTTPConnection]] = {}
+        self._ssl_contexts: Dict[bool, ssl.SSLContext] = {}
+
+    @staticmethod
+    def proxy_for(scheme: str, host: str) -> str:
+        """The proxy URL configured for requests to ``host``, or "" to connect directly."""
+        proxy = urllib.request.getproxies().get(scheme, "")
+        if not proxy or urllib.request.proxy_bypass(host):
+            return ""
+        return proxy if "://" in proxy else f"http://{proxy}"
+
+    @staticmethod
+    def proxy_headers(proxy: str) -> Dict[str, str]:
+        """Basic ``Proxy-Authorization`` for credentials embedded in the proxy URL."""
+        parts = urllib.parse.urlsplit(proxy)
+        if parts.username is None:
+            return {}
+        credentials = f"{urllib.parse.unquote(parts.username)}:{urllib.parse.unquote(parts.password or '')}"
+        return {"Proxy-Authorization": "Basic " + base64.b64encode(credentials.encode("utf-8")).decode("ascii")}
+
+    def ssl_context(self, verify: bool) -> ssl.SSLContext:
+        with self._lock:
+            ctx = self._ssl_contexts.get(verify)
+            if ctx is None:
+                ctx = ssl.create_default_context()
+                if not verify:
+                    ctx.check_hostname = False
+                    ctx.verify_mode = ssl.CERT_NONE
+                self._ssl_contexts[verify] = ctx
+            return ctx
+
+    def _connect(self, key: PoolKey, timeout: float) -> http.client.HTTPConnection:
+        scheme, host, port, verify, proxy = key
+        tunnel = None
+        if proxy:
+            parts = urllib.parse.urlsplit(proxy)
+            tunnel = (host, port)
+            host, port = parts.hostname or "", parts.port or 80
+        if scheme == "https":
+            conn: http.client.HTTPConnection = http.client.HTTPSConnection(
+                host, port, timeout=timeout, context=self.ssl_context(verify)
+            )
+            if tunnel:
+                conn.set_tunnel(*tunnel, headers=self.proxy_headers(proxy))
+            return conn
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+
+    @staticmethod
+    def _traced_connect(conn: http.client.HTTPConnection, key: PoolKey) -> None:
+        """Connect eagerly so DNS and TCP/TLS setup show up as their own trace spans.
+
+        The address is resolved once, in the ``dns`` span; the connection then dials the
+        resolved addresses instead of looking the host up again.
+        """
+        scheme, host, _, _, _ = key
+        with TRACER.span("dns", "net", host=conn.host):
+            addresses = socket.getaddrinfo(conn.host, conn.port, type=socket.SOCK_STREAM)
+
+        def create_connection(address: object, timeout: Optional[float] = None, source_address: object = None) -> socket.socket:
+            error: Optional[OSError] = None
+            for family, kind, proto, _, sockaddr in addresses:
+                sock = socket.socket(family, kind, proto)
+                try:
+                    sock.settimeout(timeout)
+                    sock.connect(sockaddr)
+                    return sock
+                except OSError as exc:
+                    sock.close()
+                    error = exc
+            raise error or OSError(f"no addresses for {conn.host}")
+
+        # http.client dials through this hook, then does the proxy tunnel and TLS handshake itself
+        conn._create_connection = create_connection  # type: ignore[attr-defined]
+        try:
+            with TRACER.span("connect", "net", host=host, tls=scheme == "https"):
+                conn.connect()
+        finally:
+            del conn._create_connection  # type: ignore[attr-defined]
+
+    def _checkout(self, key: PoolKey) -> Optional[http.client.HTTPConnection]:
+        with self._lock:
+            idle = self._idle.get(key)
+            return idle.pop() if idle else None
+
+    def _checkin(self, key: PoolKey, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    @contextmanager
+    def open(
+        self, url: str, headers: Dict[str, str], timeout: float = 30, verify: bool = True
+    ) -> Iterator[http.client.HTTPResponse]:
+        """Send a GET and yield the response; the connection is reused if the body was drained."""
+        parsed = urllib.parse.urlsplit(url)
+        scheme = parsed.scheme.lower()
+        if scheme not in {"http", "https"}:
+            raise urllib.error.URLError(f"unsupported URL scheme: {scheme}")
+        port = parsed.port or (443 if scheme == "https" else 80)
+        host = (parsed.hostname or "").lower()
+        key = (scheme, host, port, verify, self.proxy_for(scheme, host))
+        target = urllib.parse.urlunsplit(("", "", parsed.path or "/", parsed.query, ""))
+        headers = {"Host": parsed.netloc, "Connection": "keep-alive", **headers}
+        if key[4] and scheme == "http":
+            # a plain HTTP request goes to the proxy itself, naming the absolute URL
+            target = urllib.parse.urlunsplit((scheme, parsed.netloc, parsed.path or "/", parsed.query, ""))
+            headers.update(self.proxy_headers(key[4]))
+
+        conn = self._checkout(key)
+        while True:
+            reused = conn is not None
+            if conn is None:
+                conn = self._connect(key, timeout)
+            elif conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            try:
+                if not reused and TRACER.enabled:
+                    self._traced_connect(conn, key)
+                conn.request("GET", target, headers=headers)
+                resp = conn.getresponse()
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as exc:
+                conn.close()
+                if not reused:
+                    raise urllib.error.URLError(exc) from exc
+                # the server dropped an idle keep-alive connection; retry on a fresh one
+                conn = None
+            except (OSError, http.client.HTTPException) as exc:
+                conn.close()
+                raise urllib.error.URLError(exc) from exc
+
+        try:
+            yield resp
+        except BaseException:
+            conn.close()
+            raise
+        if resp.isclosed() and not resp.will_close:
+            self._checkin(key, conn)
+        else:
+            conn.close()
+
+    def close(self) -> None:
+        with self._lock:
+            idle = [conn for conns in self._idle.values() for conn in conns]
+            self._idle.clear()
+        for conn in idle:
+            conn.close()
+
+
+CONNECTION_POOL = ConnectionPool()
+
+
+class FixtureResponse:
+    """Replayed response exposing the parts of ``http.client.HTTPResponse`` that http_get reads."""
+
+    will_close = False
+
+    def __init__(self, status: int, headers: http.client.HTTPMessage, body: bytes) -> None:
+        self.status = status
+        self.headers = headers
+        self._body = io.BytesIO(body)
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        return self._body.read(amt)
+
+    def read1(self, amt: int = -1) -> bytes:
+        return self._body.read1(amt)
+
+    def isclosed(self) -> bool:
+        return True
+
+
+class FixtureStore:
+    """Record/replay transport backed by a fixture directory.
+
+    Each response is kept as ``<sha256(url)>.json`` (URL, status, headers, whether the body was
+    read in full) next to ``<sha256(url)>.body``, one pair per request URL including redirect
+    hops. Modes: ``record`` captures every network response, ``replay`` serves only from the
+    directory and never opens a socket, ``off`` does neither. ``server`` routes requests through
+    ``scripts/fixture_server.py`` instead, which replays the same directory over HTTP with
+    injected latency, throttling and errors.
+    """
+
+    SKIPPED_HEADERS = {"connection", "content-length", "keep-alive", "set-cookie", "transfer-encoding"}
+
+    def __init__(self, root: Path, mode: str = "off", server: Optional[str] = None) -> None:
+        self.root = root
+        self.mode = mode
+        self.server = server
+
+    def _path(self, url: str, suffix: str) -> Path:
+        return self.root / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}{suffix}"
+
+    def save(self, url: str, status: int, headers: Iterable[Tuple[str, str]], body: bytes, complete: bool) -> None:
+        kept = [[name, value] for name, value in headers if name.lower() not in self.SKIPPED_HEADERS]
+        meta = {"url": url, "status": status, "headers": kept, "complete": complete}
+        write_bytes_atomic(self._path(url, ".body"), body)
+        write_bytes_atomic(self._path(url, ".json"), json.dumps(meta, indent=2).encode("utf-8"))
+
+    def load(self, url: str) -> Optional[Tuple[int, List[Tuple[str, str]], bytes]]:
+        try:
+            meta = json.loads(self._path(url, ".json").read_text(encoding="utf-8"))
+            body = self._path(url, ".body").read_bytes()
+        except (OSError, ValueError):
+            return None
+        if meta.get("url") != url:
+            return None
+        return int(meta["status"]), [(str(name), str(value)) for name, value in meta["headers"]], body
+
+    def replay(self, url: str) -> FixtureResponse:
+        fixture = self.load(url)
+        if fixture is None:
+            raise OfflineMissError(f"no fixture for {url}")
+        status, headers, body = fixture
+        raw = "".join(f"{name}: {value}\r\n" for name, value in headers) + "\r\n"
+        return FixtureResponse(status, http.client.parse_headers(io.BytesIO(raw.encode("latin-1"))), body)
+
+    def server_url(self, url: str) -> str:
+        return f"{self.server.rstrip('/')}/fetch?url={urllib.parse.quote(url, safe='')}"  # type: ignore[union-attr]
+
+
+FIXTURES = FixtureStore(CACHE_DIR / "fixtures")
+
+
+@contextmanager
+def open_url(
+    url: str, headers: Dict[str, str], timeout: float = 30, verify: bool = True
+) -> Iterator[http.client.HTTPResponse | FixtureResponse]:
+    """Send one GET on the configured transport: fixture replay, the fixture server or the network."""
+    if FIXTURES.mode == "replay":
+        yield FIXTURES.replay(url)
+        return
+    target = FIXTURES.server_url(url) if FIXTURES.server else url
+    with HOST_THROTTLE.slot(url):
+        with CONNECTION_POOL.open(target, headers, timeout=timeout, verify=verify) as resp:
+            yield resp
+
+
+# A sink receives (chunk, charset) as the body streams in and returns False to stop reading.
+BodySink = Callable[[bytes, Optional[str]], bool]
+
+
+def read_body(
+    chunks: Iterable[bytes], charset: Optional[str], sink: Optional[BodySink], max_bytes: Optional[int]
+) -> Tuple[bytes, bool]:
+    """Collect a body chunk by chunk; returns the bytes read and whether the body was read in full."""
+    parts: List[bytes] = []
+    total = 0
+    for chunk in chunks:
+        if max_bytes is not None and total + len(chunk) > max_bytes:
+            chunk = chunk[: max_bytes - total]
+        parts.append(chunk)
+        total += len(chunk)
+        if sink is not None and not sink(chunk, charset):
+            return b"".join(parts), False
+        if max_bytes is not None and total >= max_bytes:
+            return b"".join(parts), False
+    return b"".join(parts), True
+
+
+def iter_response(resp: http.client.HTTPResponse) -> Iterator[bytes]:
+    while True:
+        chunk = resp.read1(STREAM_CHUNK_SIZE)
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_bytes(body: bytes) -> Iterator[bytes]:
+    for start in range(0, len(body), STREAM_CHUNK_SIZE):
+        yield body[start : start + STREAM_CHUNK_SIZE]
+
+
+def check_content_type(url: str, content_type: str, accept: Optional[Iterable[str]]) -> None:
+    if accept is not None and content_type and content_type not in accept:
+        raise ContentTypeError(f"unsupported content type {content_type} for {url}")
+
+
+def http_get(
+    url: str,
+    timeout: float = 30,
+    verify: bool = True,
+    sink: Optional[BodySink] = None,
+    max_bytes: Optional[int] = None,
+    accept: Optional[Iterable[str]] = None,
+    store: bool = True,
+) -> HttpResponse:
+    """GET through the cache, throttle and connection pool.
+
+    With ``sink`` the body is streamed to it chunk by chunk (cached bodies included) and reading
+    stops as soon as it returns False or ``max_bytes`` is reached; ``accept`` rejects other
+    content types before the body is downloaded. ``store=False`` reads from the cache but never
+    writes to it, for peeks whose partial body should not stand in for the page.
+    """
+    with TRACER.span("http_get", "http", url=url) as span:
+        if sink is not None and TRACER.enabled:
+            sink = timed_sink(sink, span)
+        result = _http_get(url, timeout, verify, sink, max_bytes, accept, store, span)
+        span.update(status=result.status, bytes=len(result.body), complete=result.complete)
+        return result
+
+
+def timed_sink(sink: BodySink, span: Dict[str, object]) -> BodySink:
+    """Wrap a sink so the time spent consuming chunks (HTML parsing) is added to ``span``."""
+    span["sink_ms"] = 0.0
+
+    def timed(chunk: bytes, charset: Optional[str]) -> bool:
+        start = time.perf_counter()
+        try:
+            return sink(chunk, charset)
+        finally:
+            span["sink_ms"] = round(float(span["sink_ms"]) + (time.perf_counter() - start) * 1000, 3)  # type: ignore[arg-type]
+
+    return timed
+
+
+def _http_get(
+    url: str,
+    timeout: float,
+    verify: bool,
+    sink: Optional[BodySink],
+    max_bytes: Optional[int],
+    accept: Optional[Iterable[str]],
+    store: bool,
+    span: Dict[str, object],
+) -> HttpResponse:
+    cache = HTTP_CACHE
+    cached = cache.lookup(url) if cache.mode in {"use", "offline"} else None
+    if cached and not cached.get("complete", True) and sink is None:
+        # a stream-truncated body is only good enough for another streaming reader
+        cached = None
+    if cached and (cache.mode == "offline" or cache.is_fresh(cached)):
+        span["cache"] = "hit"
+        result = cache.serve(cached)
+        check_content_type(url, result.content_type, accept)
+        if sink is not None:
+            read_body(iter_bytes(result.body), result.charset, sink, max_bytes)
+        return result
+    if cache.mode == "offline":
+        raise OfflineMissError(f"offline cache miss for {url}")
+
+    headers = {"User-Agent": USER_AGENT}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = str(cached["etag"])
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = str(cached["last_modified"])
+    span["cache"] = "revalidate" if cached else "miss"
+    target = url
+    for hop in range(6):
+        span["redirects"] = hop
+        with open_url(target, headers, timeout=timeout, verify=verify) as resp:
+            status = resp.status
+            location = resp.headers.get("Location")
+            charset = resp.headers.get_content_charset()
+            content_type = resp.headers.get_content_type() if resp.headers.get("Content-Type") else ""
+            etag = resp.headers.get("ETag")
+            last_modified = resp.headers.get("Last-Modified")
+            if status == 200:
+                check_content_type(url, content_type, accept)
+                body, complete = read_body(iter_response(resp), charset, sink, max_bytes)  # type: ignore[arg-type]
+            else:
+                body, complete = resp.read(), True
+        if FIXTURES.mode == "record":
+            FIXTURES.save(target, status, resp.headers.items(), body, complete)
+        if status in REDIRECT_CODES and location:
+            target = urllib.parse.urljoin(target, location)
+            continue
+        break
+    else:
+        raise urllib.error.URLError(f"too many redirects for {url}")
+
+    if status == 304 and cached:
+        span["cache"] = "revalidated"
+        result = cache.serve(cached, revalidated=True)
+        check_content_type(url, result.content_type, accept)
+        if sink is not None:
+            read_body(iter_bytes(result.body), result.charset, sink, max_bytes)
+        return result
+    if status >= 300:
+        span["status"] = status
+        raise urllib.error.HTTPError(target, status, f"HTTP {status}", resp.headers, None)
+    result = HttpResponse(
+        url=url,
+        status=status,
+        body=body,
+        charset=charset,
+        content_type=content_type,
+        complete=complete,
+    )
+
+    if cache.mode != "off" and store:
+        cache.store(result, etag, last_modified)
+    return result
+
+
+PageFields = Tuple[str, str, List[str], List[str], List[str], List[str]]
+
+
+def parse_page_body(body: bytes, charset: Optional[str]) -> PageFields:
+    """Parse a complete HTML body and extract its content sentences, as a compact picklable tuple."""
+    stream = PageStream()
+    for chunk in iter_bytes(body):
+        if not stream(chunk, charset):
+            break
+    parser = stream.close()
+    sentences = extract_content_sentences(parser.description, parser.paragraphs, parser.list_items)
+    return parser.title, parser.description, parser.headings, parser.paragraphs, parser.list_items, sentences
+
+
+def parse_pages(pages: List[Tuple[bytes, Optional[str]]]) -> List[Union[PageFields, BaseException]]:
+    """Worker-process entry point: one result per page, with failures returned rather than raised."""
+    results: List[Union[PageFields, BaseException]] = []
+    for body, charset in pages:
+        try:
+            results.append(parse_page_body(body, charset))
+        except Exception as exc:
+            results.append(exc)
+    return results
+
+
+class ParsePool:
+    """Parses fetched HTML bodies and extracts their sentences in worker processes.
+
+    Fetch threads hand over raw bodies with ``parse``. A dispatcher thread submits whatever is
+    queued at that moment as one task of up to ``chunk_size`` pages, so a burst of pages costs one
+    round trip to a worker and a lone page never waits for company. Writes stay in this process;
+    until ``start`` (and after ``close``) pages are parsed in the calling thread.
+    """
+
+    def __init__(self, chunk_size: int = 16) -> None:
+        self.chunk_size = chunk_size
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._jobs: "queue.Queue[Optional[Tuple[bytes, Optional[str], Future[ParsedPage]]]]" = queue.Queue()
+        self._dispatcher: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self._pool is not None
+
+    def start(self, workers: int) -> None:
+        if workers <= 0 or self._pool is not None:
+            return
+        # spawn rather than fork: fetch threads are already running, and forking a threaded process can deadlock
+        self._pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        self._dispatcher = threading.Thread(target=self._dispatch, name="parse-dispatch", daemon=True)
+        self._dispatcher.start()
+
+    def parse(self, body: bytes, charset: Optional[str]) -> ParsedPage:
+        future: Future[ParsedPage] = Future()
+        with self._lock:
+            if self._pool is None:
+                return ParsedPage(*parse_page_body(body, charset))
+            self._jobs.put((body, charset, future))
+        return future.result()
+
+    def _dispatch(self) -> None:
+        assert self._pool is not None
+        stopping = False
+        while not stopping:
+            job = self._jobs.get()
+            chunk = []
+            while job is not None:
+                chunk.append(job)
+                if len(chunk) >= self.chunk_size:
+                    break
+                try:
+                    job = self._jobs.get_nowait()
+                except queue.Empty:
+                    break
+            if job is None:
+                # close() queues None last, so anything queued before it is in this chunk or already submitted
+                stopping = True
+            if not chunk:
+                continue
+            futures = [future for _, _, future in chunk]
+            try:
+                task = self._pool.submit(parse_pages, [(body, charset) for body, charset, _ in chunk])
+            except Exception as exc:
+                for future in futures:
+                    future.set_exception(exc)
+                continue
+            task.add_done_callback(lambda task, futures=futures: self._deliver(task, futures))  # type: ignore[misc]
+
+    @staticmethod
+    def _deliver(task: "Future[List[Union[PageFields, BaseException]]]", futures: List["Future[ParsedPage]"]) -> None:
+        try:
+            results = task.result()
+        except BaseException as exc:
+            for future in futures:
+                future.set_exception(exc)
+            return
+        for future, result in zip(futures, results):
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(ParsedPage(*result))
+
+    def close(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+            if pool is None:
+                return
+            self._jobs.put(None)
+        assert self._dispatcher is not None
+        self._dispatcher.join()
+        pool.shutdown(wait=True)
+
+
+PARSE_POOL = ParsePool()
+
+
+def fetch_page(url: str, max_bytes: Optional[int] = None, title_only: bool = False) -> ParsedPage:
+    """Stream an HTML page into a PageParser, stopping once the parser caps or the byte limit are hit.
+
+    ``title_only`` stops at the first ``<title>`` and reads at most ``TITLE_PEEK_BYTES``. With the
+    parse pool started, full pages are read up to the byte limit and parsed in a worker process,
+    which also extracts their content sentences.
+    """
+    limit = PAGE_MAX_BYTES if max_bytes is None else max_bytes
+    until: Optional[Callable[[PageParser], bool]] = None
+    if title_only:
+        limit = min(limit, TITLE_PEEK_BYTES)
+        until = lambda parser: bool(parser.title)  # noqa: E731
+    options = dict(max_bytes=limit, accept=HTML_CONTENT_TYPES, store=not title_only)
+    with TRACER.span("fetch_page", "fetch", url=url, title_only=title_only) as span:
+        for attempt in range(1, 3):
+            span["attempts"] = attempt
+            try:
+                return read_page(url, until, options)
+            except urllib.error.URLError as exc:
+                reason = getattr(exc, "reason", None)
+                if isinstance(reason, ssl.SSLCertVerificationError):
+                    span["ssl_fallback"] = True
+                    return read_page(url, until, dict(options, verify=False))
+                last = exc
+        raise last  # type: ignore[name-defined]
+
+
+def read_page(url: str, until: Optional[Callable[[PageParser], bool]], options: Dict[str, Any]) -> ParsedPage:
+    if until is None and PARSE_POOL.enabled:
+        response = http_get(url, **options)
+        with TRACER.span("parse_wait", "fetch", url=url, bytes=len(response.body)):
+            page = PARSE_POOL.parse(response.body, response.charset)
+    else:
+        stream = PageStream(until=until)
+        response = http_get(url, sink=stream, **options)
+        page = ParsedPage.from_parser(stream.close())
+    page.html, page.charset = response.body, response.charset
+    return page
+
+
+def fetch_x_oembed(url: str) -> Optional[Dict[str, str]]:
+    endpoint = "https://publish.twitter.com/oembed?url=" + urllib.parse.quote(url, safe="")
+    try:
+        with TRACER.span("oembed", "fetch", url=url):
+            raw = http_get(endpoint).body.decode("utf-8", errors="replace")
+            data = json.loads(raw)
+    except Exception:
+        return None
+
+    html = clean_text(data.get("html", ""))
+    text = clean_text(HTML_TAG_RE.sub(" ", html))
+    return {
+        "author_name": clean_text(data.get("author_name", "")),
+        "author_url": clean_text(data.get("author_url", "")),
+        "provider_name": clean_text(data.get("provider_name", "")),
+        "embed_text": text,
+    }
+
+
+def arxiv_id_from_url(url: str) -> str:
+    parsed = urllib.parse.urlparse(url)
+    if parsed.netloc.lower() not in {"arxiv.org", "www.arxiv.org"}:
+        return ""
+    parts = [p for p in parsed.path.split("/") if p]
+    if len(parts) >= 2 and parts[0] in {"abs", "pdf"}:
+        return parts[1].replace(".pdf", "")
+    return ""
+
+
+def parse_arxiv_feed(raw: str) -> List[ArxivEntry]:
+    root = ET.fromstring(raw)
+    entries: List[ArxivEntry] = []
+    for node in root.findall("atom:entry", ATOM_NS):
+        entry_id = node.findtext("atom:id", "", ATOM_NS)
+        if "/abs/" not in entry_id:
+            # the API reports unknown or malformed ids as error entries
+            continue
+        categories = [c.get("term", "") for c in node.findall("atom:category", ATOM_NS)]
+        primary = node.find("arxiv:primary_category", ATOM_NS)
+        if primary is not None and primary.get("term") in categories:
+            categories.remove(primary.get("term", ""))
+            categories.insert(0, primary.get("term", ""))
+        entries.append(
+            ArxivEntry(
+                arxiv_id=entry_id.rsplit("/abs/", 1)[1],
+                title=clean_text(node.findtext("atom:title", "", ATOM_NS)),
+                summary=clean_text(node.findtext("atom:summary", "", ATOM_NS)),
+                authors=clean_texts(a.findtext("atom:name", "", ATOM_NS) for a in node.findall("atom:author", ATOM_NS)),
+                categories=[c for c in categories if c],
+                published=node.findtext("atom:published", "", ATOM_NS)[:10],
+                updated=node.findtext("atom:updated", "", ATOM_NS)[:10],
+            )
+        )
+    return entries
+
+
+def strip_arxiv_version(arxiv_id: str) -> str:
+    return re.sub(r"v\d+$", "", arxiv_id)
+
+
+HOST_ALIASES = {
+    "twitter.com": "x.com",
+    "mobile.twitter.com": "x.com",
+    "mobile.x.com": "x.com",
+    "m.youtube.com": "youtube.com",
+    "export.arxiv.org": "arxiv.org",
+}
+DEFAULT_PORTS = {"http": 80, "https": 443}
+TRACKING_PARAM_RE = re.compile(r"^(?:utm_\w+|fbclid|gclid|dclid|msclkid|mc_cid|mc_eid|igshid|_hsenc|_hsmi|ref_src|ref_url)$", re.I)
+# share-tracking parameters that only carry meaning on these hosts
+HOST_TRACKING_PARAMS = {"x.com": {"s", "t"}, "youtube.com": {"si", "feature"}, "youtu.be": {"si", "feature"}}
+
+
+def canonical_url(url: str) -> str:
+    """Comparison key for a source URL; it is never fetched.
+
+    Scheme, host case, ``www.``, default ports, fragments, trailing slashes, tracking parameters
+    and parameter order are normalized away; twitter.com becomes x.com, youtu.be links become
+    watch URLs and arXiv abs/pdf links of any version become the versionless abs page.
+    """
+    url = url.strip()
+    parts = urllib.parse.urlsplit(url)
+    host = (parts.hostname or "").lower().removeprefix("www.")
+    if not host:
+        return url
+    host = HOST_ALIASES.get(host, host)
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    path = re.sub(r"/{2,}", "/", parts.path).rstrip("/")
+    ignored = HOST_TRACKING_PARAMS.get(host, set())
+    query = [
+        (key, value)
+        for key, value in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+        if not TRACKING_PARAM_RE.match(key) and key not in ignored
+    ]
+    if host == "arxiv.org":
+        arxiv_id = arxiv_id_from_url(f"https://arxiv.org{path}")
+        if arxiv_id:
+            path, query = f"/abs/{strip_arxiv_version(arxiv_id)}", []
+    elif host == "youtu.be" and path:
+        host, path, query = "youtube.com", "/watch", [("v", path.lstrip("/")), *query]
+    netloc = host if port in (None, DEFAULT_PORTS.get(parts.scheme.lower())) else f"{host}:{port}"
+    return urllib.parse.urlunsplit(("https", netloc, path, urllib.parse.urlencode(sorted(query)), ""))
+
+
+class ArxivResolver:
+    """Resolves arXiv metadata for many ids with one ``id_list`` query per chunk.
+
+    ``prefetch`` is fed every id seen in a run before pages are fetched; ``get`` then waits on
+    the shared chunk result instead of issuing its own request. Parsed entries are also kept
+    per id under ``.cache/arxiv`` and honour the HTTP cache mode and TTL. In memory, resolved
+    entries expire after the same TTL and failed lookups are dropped as soon as their waiters
+    have the result, so the next request for the id asks arXiv again.
+    """
+
+    def __init__(self, cache_dir: Path, batch_size: int = ARXIV_BATCH_SIZE) -> None:
+        self.cache_dir = cache_dir
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        # id -> (time the lookup started, its result)
+        self._results: Dict[str, Tuple[float, Future[Optional[ArxivEntry]]]] = {}
+
+    def _cache_path(self, arxiv_id: str) -> Path:
+        return self.cache_dir / f"{arxiv_id.replace('/', '_')}.json"
+
+    def _load(self, arxiv_id: str) -> Optional[ArxivEntry]:
+        if HTTP_CACHE.mode not in {"use", "offline"}:
+            return None
+        path = self._cache_path(arxiv_id)
+        try:
+            if HTTP_CACHE.mode == "use" and time.time() - path.stat().st_mtime >= HTTP_CACHE.ttl:
+                return None
+            return ArxivEntry(**json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def _save(self, entry: ArxivEntry, arxiv_id: str) -> None:
+        if HTTP_CACHE.mode != "off":
+            write_bytes_atomic(self._cache_path(arxiv_id), json.dumps(entry.__dict__).encode("utf-8"))
+
+    def _resolve_chunk(self, ids: List[str]) -> None:
+        entries: Dict[str, ArxivEntry] = {}
+        try:
+            query = urllib.parse.urlencode({"id_list": ",".join(ids), "max_results": len(ids)})
+            with TRACER.span("arxiv_query", "fetch", ids=len(ids)):
+                raw = http_get(f"{ARXIV_API}?{query}").body.decode("utf-8", errors="replace")
+            for entry in parse_arxiv_feed(raw):
+                entries[entry.arxiv_id] = entry
+                entries.setdefault(strip_arxiv_version(entry.arxiv_id), entry)
+        except Exception:
+            pass
+        for arxiv_id in ids:
+            entry = entries.get(arxiv_id) or entries.get(strip_arxiv_version(arxiv_id))
+            if entry:
+                self._save(entry, arxiv_id)
+            with self._lock:
+                _, future = self._results[arxiv_id]
+                if not entry:
+                    # a failed query or an unknown id: current waiters get None, later lookups retry
+                    del self._results[arxiv_id]
+            future.set_result(entry)
+
+    def prefetch(
+        self, ids: Iterable[str], executor: Optional[Executor] = None
+    ) -> Dict[str, Future[Optional[ArxivEntry]]]:
+        """Start lookups for ``ids`` not already resolved or in flight; returns every id's future."""
+        futures: Dict[str, Future[Optional[ArxivEntry]]] = {}
+        pending: List[str] = []
+        now = time.time()
+        with self._lock:
+            for arxiv_id in dict.fromkeys(ids):
+                if not arxiv_id:
+                    continue
+                held = self._results.get(arxiv_id)
+                if held is not None and not (held[1].done() and now - held[0] >= HTTP_CACHE.ttl):
+                    futures[arxiv_id] = held[1]
+                    continue
+                future: Future[Optional[ArxivEntry]] = Future()
+                futures[arxiv_id] = future
+                self._results[arxiv_id] = (now, future)
+                cached = self._load(arxiv_id)
+                if cached:
+                    future.set_result(cached)
+                else:
+                    pending.append(arxiv_id)
+        for start in range(0, len(pending), self.batch_size):
+            chunk = pending[start : start + self.batch_size]
+            if executor is None:
+                self._resolve_chunk(chunk)
+            else:
+                executor.submit(self._resolve_chunk, chunk)
+        return futures
+
+    def get(self, arxiv_id: str) -> Optional[ArxivEntry]:
+        if not arxiv_id:
+            return None
+        return self.prefetch([arxiv_id])[arxiv_id].result()
+
+    def forget(self, ids: Iterable[str]) -> None:
+        """Drop resolved results so the next lookup of these ids is made again."""
+        with self._lock:
+            for arxiv_id in ids:
+                held = self._results.get(arxiv_id)
+                if held is not None and held[1].done():
+                    del self._results[arxiv_id]
+
+
+ARXIV_RESOLVER = ArxivResolver(CACHE_DIR / "arxiv")
+
+
+def fetch_arxiv_metadata(arxiv_id: str) -> Optional[Tuple[str, str]]:
+    entry = ARXIV_RESOLVER.get(arxiv_id)
+    if not entry or not entry.summary:
+        return None
+    return entry.title, entry.summary
+
+
+def fetch_source_record(url: str) -> SourceRecord:
+    with TRACER.span("source", "fetch", url=url) as span:
+        parsed = urllib.parse.urlparse(url)
+        title = derive_title_from_url(parsed)
+        description = ""
+        headings: List[str] = []
+        paragraphs: List[str] = []
+        list_items: List[str] = []
+        sentences: Optional[List[str]] = None
+        page: Optional[ParsedPage] = None
+        access_limited = False
+        oembed_info: Optional[Dict[str, str]] = None
+        fetch_error: Optional[BaseException] = None
+
+        try:
+            page = fetch_page(url)
+            title = clean_text(page.title) or title
+            description = clean_text(page.description)
+            headings = page.headings
+            paragraphs = page.paragraphs
+            list_items = page.list_items
+            sentences = page.sentences
+            haystack = " ".join([title, description, *paragraphs]).lower()
+            if parsed.netloc.lower() in {"x.com", "twitter.com"} and "javascript is disabled" in haystack:
+                access_limited = True
+                oembed_info = fetch_x_oembed(url)
+        except Exception as exc:
+            access_limited = True
+            fetch_error = exc
+            if parsed.netloc.lower() in {"x.com", "twitter.com"}:
+                oembed_info = fetch_x_oembed(url)
+
+        with TRACER.span("arxiv_wait", "fetch", url=url):
+            arxiv_entry = ARXIV_RESOLVER.get(arxiv_id_from_url(url))
+        if arxiv_entry and arxiv_entry.summary:
+            if arxiv_entry.title:
+                title = arxiv_entry.title
+            description = arxiv_entry.summary
+            if arxiv_entry.summary not in paragraphs:
+                paragraphs = [arxiv_entry.summary, *paragraphs]
+            access_limited = False
+            sentences = None
+
+        span["access_limited"] = access_limited
+        record = SourceRecord(
+            url=url,
+            title=title,
+            description=description,
+            headings=headings,
+            paragraphs=paragraphs,
+            list_items=list_items,
+            access_limited=access_limited,
+            oembed_info=oembed_info,
+            arxiv=arxiv_entry,
+            fetch_error=fetch_error,
+            sentences=sentences,
+        )
+        if page is not None and fetch_error is None:
+            SNAPSHOTS.add(record, page.html, page.charset)
+        return record
+
+
+def fetch_source_title(url: str) -> SourceRecord:
+    """Bibliography-only record: arXiv metadata or just enough of the page to read its title."""
+    title = derive_title_from_url(urllib.parse.urlparse(url))
+    arxiv_entry = ARXIV_RESOLVER.get(arxiv_id_from_url(url))
+    if arxiv_entry and arxiv_entry.title:
+        title = arxiv_entry.title
+    else:
+        try:
+            title = clean_text(fetch_page(url, title_only=True).title) or title
+        except Exception:
+            pass
+    return SourceRecord(url, title, "", [], [], [], False, None, arxiv=arxiv_entry)
+
+
+class SourceFetcher:
+    """Fetches source records on a bounded thread pool.
+
+    Results are memoized by URL for the lifetime of the fetcher, so corroborating sources
+    shared between notes in a batch are only fetched once. Title-only requests reuse a full
+    record when one was already requested for the same URL.
+    """
+
+    def __init__(self, max_workers: int = 8) -> None:
+        self._pool = ProfiledThreadPool(
+            max_workers=max(max_workers, 1), thread_name_prefix="fetch", initializer=PROFILER.start_thread
+        )
+        self._futures: Dict[str, Future[SourceRecord]] = {}
+        self._title_futures: Dict[str, Future[SourceRecord]] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, urls: Iterable[str], title_urls: Iterable[str] = ()) -> None:
+        """Queue full fetches for ``urls`` and bibliography-only fetches for ``title_urls``."""
+        urls = list(urls)
+        title_urls = list(title_urls)
+        # resolve every arXiv id in this submission with shared id_list queries
+        ARXIV_RESOLVER.prefetch((arxiv_id_from_url(url) for url in [*urls, *title_urls]), self._pool)
+        with self._lock:
+            for url in urls:
+                if url not in self._futures:
+                    self._futures[url] = self._pool.submit(fetch_source_record, url)
+            for url in title_urls:
+                if url not in self._futures and url not in self._title_futures:
+                    self._title_futures[url] = self._pool.submit(fetch_source_title, url)
+
+    def fetch_all(self, urls: List[str], title_only: bool = False) -> List[SourceRecord]:
+        if title_only:
+            self.submit([], urls)
+        else:
+            self.submit(urls)
+        with self._lock:
+            futures = [self._futures.get(url) or self._title_futures[url] for url in urls]
+        return [future.result() for future in futures]
+
+    def drop_blocks(self, urls: Iterable[str]) -> None:
+        """Shrink finished records that are now only needed as corroborating sources."""
+        with self._lock:
+            futures = [self._futures.get(url) for url in urls]
+        for future in futures:
+            if future is not None and future.done() and not future.cancelled() and future.exception() is None:
+                future.result().drop_blocks()
+
+    def forget(self, urls: Iterable[str]) -> None:
+        """Drop memoized results so the next request for these URLs fetches again."""
+        urls = list(urls)
+        with self._lock:
+            for url in urls:
+                self._futures.pop(url, None)
+                self._title_futures.pop(url, None)
+        ARXIV_RESOLVER.forget(arxiv_id_from_url(url) for url in urls)
+
+    def close(self) -> None:
+        # a profiled run waits, so no worker is still inside a profiled task when the report merges them
+        self._pool.shutdown(wait=PROFILER.enabled, cancel_futures=True)
+
+
+@dataclass(frozen=True)
+class Keyword:
+    text: str
+    table: str
+    label: str
+    weight: float = 1.0
+    whole_word: bool = False
+
+
+class KeywordClassifier:
+    """Scores the group and level keyword tables together in one pass over the text.
+
+    Tables map a label to either a list of keywords or a ``{keyword: spec}`` dict, where a spec
+    is a weight or ``{"weight": 2, "whole_word": true}``. Keywords match as substrings by default,
+    giving the same counts as one ``str.count`` per keyword.
+
+    Single-token keywords cannot straddle whitespace, so the lowercased text is split once and
+    each distinct token is matched against a prefix-trie regex; token results are memoized, which
+    makes repeated vocabulary nearly free. The few multi-word keywords are counted directly.
+    """
+
+    TOKEN_MEMO_LIMIT = 100_000
+
+    def __init__(self, tables: Dict[str, Dict[str, object]], fallbacks: Dict[str, str]) -> None:
+        self.fallbacks = fallbacks
+        self.labels: Dict[str, List[str]] = {table: list(entries) for table, entries in tables.items()}
+        self._by_text: Dict[str, List[Keyword]] = {}
+        for table, entries in tables.items():
+            for label, keywords in entries.items():
+                specs = keywords if isinstance(keywords, dict) else {kw: 1.0 for kw in keywords}  # type: ignore[union-attr]
+                for text, spec in specs.items():
+                    if isinstance(spec, dict):
+                        keyword = Keyword(
+                            text.lower(), table, label, float(spec.get("weight", 1.0)), bool(spec.get("whole_word", False))
+                        )
+                    else:
+                        keyword = Keyword(text.lower(), table, label, float(spec))  # type: ignore[arg-type]
+                    self._by_text.setdefault(keyword.text, []).append(keyword)
+
+        single = [text for text in self._by_text if not re.search(r"\s", text)]
+        # The trie pattern matches the longest keyword at a position; every other keyword matching
+        # at the same position is a prefix of it, so the shorter hits are credited from this table.
+        self._prefixes = {text: [other for other in single if text.startswith(other)] for text in single}
+        self._pattern = re.compile(trie_pattern(single)) if single else None
+        self._whole = {text for text, keywords in self._by_text.items() if any(k.whole_word for k in keywords)}
+        self._phrases = [
+            (
+                text,
+                re.compile(r"(?<!\w)" + re.escape(text) + r"(?!\w)") if any(k.whole_word for k in keywords) else None,
+                keywords,
+            )
+            for text, keywords in self._by_text.items()
+            if text not in self._prefixes
+        ]
+        self._token_memo: Dict[str, List[Tuple[Keyword, int]]] = {}
+
+    @classmethod
+    def from_config(cls, path: Path) -> "KeywordClassifier":
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return cls(
+            {"group": data.get("groups", GROUP_KEYWORDS), "level": data.get("levels", LEVEL_KEYWORDS)},
+            DEFAULT_CLASSIFICATION,
+        )
+
+    def _token_hits(self, token: str) -> List[Tuple[Keyword, int]]:
+        hits = self._token_memo.get(token)
+        if hits is not None:
+            return hits
+        counts: Dict[Keyword, int] = {}
+        # like str.count (and findall for whole words), a keyword's next match may only start at
+        # or after the end of its previous one
+        plain_free: Dict[str, int] = {}
+        whole_free: Dict[str, int] = {}
+        match = self._pattern.search(token) if self._pattern else None
+        while match:
+            start = match.start()
+            for text in self._prefixes[match.group()]:
+                end = start + len(text)
+                plain = start >= plain_free.get(text, 0)
+                whole = text in self._whole and start >= whole_free.get(text, 0) and is_word_match(token, start, end)
+                if plain:
+                    plain_free[text] = end
+                if whole:
+                    whole_free[text] = end
+                for keyword in self._by_text[text]:
+                    if whole if keyword.whole_word else plain:
+                        counts[keyword] = counts.get(keyword, 0) + 1
+            # resume one character later so other keywords overlapping this hit are still counted
+            match = self._pattern.search(token, start + 1)  # type: ignore[union-attr]
+        hits = list(counts.items())
+        if len(self._token_memo) >= self.TOKEN_MEMO_LIMIT:
+            self._token_memo.clear()
+        self._token_memo[token] = hits
+        return hits
+
+    def scores(self, text: str) -> Dict[str, Dict[str, float]]:
+        scores = {table: {label: 0.0 for label in labels} for table, labels in self.labels.items()}
+        haystack = text.lower()
+        for token, frequency in Counter(haystack.split()).items():
+            for keyword, count in self._token_hits(token):
+                scores[keyword.table][keyword.label] += keyword.weight * count * frequency
+        for phrase, bounded, keywords in self._phrases:
+            plain = haystack.count(phrase)
+            if not plain:
+                continue
+            whole = len(bounded.findall(haystack)) if bounded else plain
+            for keyword in keywords:
+                scores[keyword.table][keyword.label] += keyword.weight * (whole if keyword.whole_word else plain)
+        return scores
+
+    def classify(self, text: str) -> Dict[str, str]:
+        picked: Dict[str, str] = {}
+        for table, table_scores in self.scores(text).items():
+            best_label, best_score = max(table_scores.items(), key=lambda item: item[1])
+            picked[table] = best_label if best_score > 0 else self.fallbacks[table]
+        return picked
+
+
+def trie_pattern(words: Iterable[str]) -> str:
+    """Regex alternation factored by shared prefixes, so each position is tested once per branch."""
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # greedy optional suffix keeps the longest keyword at each position
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+def is_word_match(text: str, start: int, end: int) -> bool:
+    before = text[start - 1] if start > 0 else " "
+    after = text[end] if end < len(text) else " "
+    return not (before.isalnum() or before == "_") and not (after.isalnum() or after == "_")
+
+
+DEFAULT_CLASSIFICATION = {"group": "ai", "level": "intermediate"}
+CLASSIFIER = KeywordClassifier({"group": GROUP_KEYWORDS, "level": LEVEL_KEYWORDS}, DEFAULT_CLASSIFICATION)  # type: ignore[dict-item]
+
+
+class CentroidClassifier:
+    """Group and level centroids of hashed term frequencies, learned from the vault's notes.
+
+    Each knowledge note's 4+ letter words (minus the note template's) are hashed into
+    ``DIMENSIONS`` buckets, weighted by log term frequency and L2-normalized; the vector is added
+    to the centroid of the note's ``domain`` and of its level tag. The centroid sums are one
+    float32 array in ``.cache/centroids.npz``, stored with every note's sparse vector and stamp,
+    so added, changed and deleted notes are applied as deltas instead of re-reading the vault.
+
+    ``classify_many`` scores a batch of texts with one matrix multiply. A table is left out of
+    the result when fewer than two of its labels have ``MIN_NOTES`` notes, or when the best
+    cosine or its lead over the runner-up is too small.
+    """
+
+    VERSION = 1
+    DIMENSIONS = 1 << 13
+    MIN_NOTES = 3
+    MIN_SCORE = 0.1
+    MIN_MARGIN = 0.02
+    BATCH_SIZE = 512
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.enabled = np is not None
+        self.labels = [("group", group) for group in GROUPS] + [("level", level) for level in LEVEL_KEYWORDS]
+        # rel path -> (stamp, centroid rows, bucket indices, weights)
+        self._notes: Optional[Dict[str, Tuple[List[int], List[int], Any, Any]]] = None
+        self._sums: Any = None
+        self._template: Optional[set[str]] = None
+        self._dirty = False
+
+    def template_words(self) -> set[str]:
+        if self._template is None:
+            self._template = set()
+            for text in blank_note_texts():
+                self._template.update(SIGNATURE_TOKEN_RE.findall(text.lower()))
+        return self._template
+
+    def features(self, text: str) -> Tuple[Any, Any]:
+        """Sorted bucket indices and unit-length weights of a text (a note's frontmatter is skipped)."""
+        match = FRONTMATTER_RE.match(text)
+        words = Counter(SIGNATURE_TOKEN_RE.findall((text[match.end() :] if match else text).lower()))
+        template = self.template_words()
+        buckets: Dict[int, int] = {}
+        for word, count in words.items():
+            if word not in template:
+                bucket = zlib.crc32(word.encode("utf-8")) % self.DIMENSIONS
+                buckets[bucket] = buckets.get(bucket, 0) + count
+        indices = np.fromiter(sorted(buckets), dtype=np.int32, count=len(buckets))
+        weights = np.log1p(np.fromiter((buckets[i] for i in indices.tolist()), dtype=np.float32, count=len(buckets)))
+        norm = float(np.linalg.norm(weights))
+        return indices, weights / norm if norm else weights
+
+    def note_rows(self, group: str, text: str) -> List[int]:
+        fields = parse_frontmatter(text)
+        rows = [self.labels.index(("group", fields["domain"] if fields.get("domain") in GROUPS else group))]
+        level = next((tag for tag in note_tags(fields) if tag in LEVEL_KEYWORDS), None)
+        if level:
+            rows.append(self.labels.index(("level", level)))
+        return rows
+
+    def _apply(self, rel_path: str, note: Optional[Tuple[List[int], List[int], Any, Any]]) -> None:
+        """Replace a note's contribution to the centroid sums (``None`` removes the note)."""
+        assert self._notes is not None
+        previous = self._notes.pop(rel_path, None)
+        if previous is not None:
+            for row in previous[1]:
+                self._sums[row, previous[2]] -= previous[3]
+        if note is not None:
+            self._notes[rel_path] = note
+            for row in note[1]:
+                self._sums[row, note[2]] += note[3]
+        self._dirty = True
+
+    def _load(self) -> Dict[str, Tuple[List[int], List[int], Any, Any]]:
+        if self._notes is not None:
+            return self._notes
+        with TRACER.span("centroids_load", "index") as span:
+            notes: Dict[str, Tuple[List[int], List[int], Any, Any]] = {}
+            sums = np.zeros((len(self.labels), self.DIMENSIONS), dtype=np.float32)
+            try:
+                with np.load(self.path) as data:
+                    meta = json.loads(str(data["meta"]))
+                    if meta["version"] == [self.VERSION, NOTE_FORMAT_VERSION, self.DIMENSIONS] and meta["labels"] == [
+                        list(label) for label in self.labels
+                    ]:
+                        indices, weights, sums = data["indices"], data["weights"], data["sums"]
+                        for rel_path, (stamp, rows, start, end) in meta["notes"].items():
+                            notes[rel_path] = (stamp, rows, indices[start:end], weights[start:end])
+            except (OSError, ValueError, KeyError, TypeError):
+                notes = {}
+                sums = np.zeros((len(self.labels), self.DIMENSIONS), dtype=np.float32)
+            self._notes, self._sums = notes, sums
+            stale = set(self._notes)
+            self._dirty = False
+            for group, cfg in GROUPS.items():
+                for path in (ROOT / cfg.knowledge_dir).glob("*/README.md"):
+                    rel_path = path.relative_to(ROOT).as_posix()
+                    stale.discard(rel_path)
+                    try:
+                        stat = path.stat()
+                        stamp = [stat.st_mtime_ns, stat.st_size]
+                        known = self._notes.get(rel_path)
+                        if known is None or known[0] != stamp:
+                            text = path.read_text(encoding="utf-8")
+                            self._apply(rel_path, (stamp, self.note_rows(group, text), *self.features(text)))
+                    except (OSError, UnicodeDecodeError):
+                        continue
+            for rel_path in stale:
+                self._apply(rel_path, None)
+            span["notes"] = len(self._notes)
+        return self._notes
+
+    def update(self, path: Path, text: str) -> None:
+        """Retrain on a note this process wrote (no-op until loaded: the stamp check catches it then)."""
+        if self._notes is None:
+            return
+        try:
+            rel_path = path.resolve().relative_to(ROOT)
+            stat = path.stat()
+        except (ValueError, OSError):
+            return
+        group = next((name for name, cfg in GROUPS.items() if rel_path.parent.parent == cfg.knowledge_dir), None)
+        if path.name != "README.md" or group is None:
+            return
+        self._apply(rel_path.as_posix(), ([stat.st_mtime_ns, stat.st_size], self.note_rows(group, text), *self.features(text)))
+
+    def classify_many(self, texts: List[str]) -> List[Dict[str, str]]:
+        """The confidently predicted tables (possibly none) for each text."""
+        if not self.enabled or not texts:
+            return [{} for _ in texts]
+        self._load()
+        counts = [0] * len(self.labels)
+        for _, rows, _, _ in self._notes.values():  # type: ignore[union-attr]
+            for row in rows:
+                counts[row] += 1
+        tables: Dict[str, List[int]] = {}
+        for row, (table, _) in enumerate(self.labels):
+            if counts[row] >= self.MIN_NOTES:
+                tables.setdefault(table, []).append(row)
+        tables = {table: rows for table, rows in tables.items() if len(rows) >= 2}
+        picked: List[Dict[str, str]] = [{} for _ in texts]
+        if not tables:
+            return picked
+        norms = np.linalg.norm(self._sums, axis=1, keepdims=True)
+        centroids = (self._sums / np.where(norms > 0, norms, 1)).T
+        for offset in range(0, len(texts), self.BATCH_SIZE):
+            chunk = texts[offset : offset + self.BATCH_SIZE]
+            matrix = np.zeros((len(chunk), self.DIMENSIONS), dtype=np.float32)
+            for position, text in enumerate(chunk):
+                indices, weights = self.features(text)
+                matrix[position, indices] = weights
+            scores = matrix @ centroids
+            for table, rows in tables.items():
+                table_scores = scores[:, rows]
+                ranked = np.sort(table_scores, axis=1)
+                best = table_scores.argmax(axis=1)
+                confident = (ranked[:, -1] >= self.MIN_SCORE) & (ranked[:, -1] - ranked[:, -2] >= self.MIN_MARGIN)
+                for position in np.flatnonzero(confident).tolist():
+                    picked[offset + position][table] = self.labels[rows[best[position]]][1]
+        return picked
+
+    def refresh(self) -> None:
+        if self.enabled:
+            self._load()
+
+    def flush(self) -> None:
+        if not self._dirty or self._notes is None:
+            return
+        notes = sorted(self._notes.items())
+        meta: Dict[str, object] = {
+            "version": [self.VERSION, NOTE_FORMAT_VERSION, self.DIMENSIONS],
+            "labels": [list(label) for label in self.labels],
+            "notes": {},
+        }
+        start = 0
+        for rel_path, (stamp, rows, indices, _) in notes:
+            meta["notes"][rel_path] = [stamp, rows, start, start + len(indices)]  # type: ignore[index]
+            start += len(indices)
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            meta=np.array(json.dumps(meta, separators=(",", ":"))),
+            sums=self._sums,
+            indices=np.concatenate([note[2] for _, note in notes] or [np.zeros(0, dtype=np.int32)]),
+            weights=np.concatenate([note[3] for _, note in notes] or [np.zeros(0, dtype=np.float32)]),
+        )
+        write_bytes_atomic(self.path, buffer.getvalue())
+        self._dirty = False
+
+
+CENTROIDS = CentroidClassifier(CACHE_DIR / "centroids.npz")
+
+
+def classify_texts(texts: List[str]) -> List[Dict[str, str]]:
+    """Group and level of each text from the keyword tables.
+
+    Tables with no keyword hits are decided by the vault centroids, scored together for the whole
+    batch, and only fall back to ``DEFAULT_CLASSIFICATION`` when those are not confident either.
+    """
+    results: List[Dict[str, str]] = []
+    unmatched: List[int] = []
+    for position, text in enumerate(texts):
+        picked: Dict[str, str] = {}
+        for table, table_scores in CLASSIFIER.scores(text).items():
+            label, score = max(table_scores.items(), key=lambda item: item[1])
+            if score > 0:
+                picked[table] = label
+        results.append(picked)
+        if len(picked) < len(CLASSIFIER.labels):
+            unmatched.append(position)
+    learned = CENTROIDS.classify_many([texts[position] for position in unmatched])
+    for position, guesses in zip(unmatched, learned):
+        results[position] = {**CLASSIFIER.fallbacks, **guesses, **results[position]}
+    return results
+
+
+def classify_group(text: str) -> str:
+    return classify_texts([text])[0]["group"]
+
+
+def classify_level(text: str) -> str:
+    return classify_texts([text])[0]["level"]
+
+
+def unique_note_dir(base_dir: Path, slug: str, source_url: str = "") -> Path:
+    """The first free ``slug``/``slug-N`` directory.
+
+    With ``source_url``, a taken directory whose note has that source (by ``canonical_url``) is
+    returned instead: a run that crashed after writing the note but before flushing its index
+    entry leaves such a note behind, and resuming must update it rather than add a copy.
+    """
+    key = canonical_url(source_url) if source_url else None
+    candidate = base_dir / slug
+    i = 2
+    while candidate.exists():
+        if key is not None and canonical_url(read_frontmatter(candidate / "README.md").get("source_url", "")) == key:
+            return candidate
+        candidate = base_dir / f"{slug}-{i}"
+        i += 1
+    return candidate
+
+
+def ensure_knowledge_index(group: str, cfg: GroupConfig) -> None:
+    index_path = ROOT / cfg.knowledge_index
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    if index_path.exists():
+        return
+    VAULT.create_file(index_path, knowledge_index_template(group, cfg))
+
+
+def knowledge_index_template(group: str, cfg: GroupConfig) -> str:
+    title = f"{group.title()} Knowledge Index"
+    return "\n".join(
+        [
+            "---",
+            f"created: {TODAY}",
+            f"updated: {TODAY}",
+            f"tags: [{cfg.domain}, knowledge, index]",
+            f"domain: {cfg.domain}",
+            "status: active",
+            "---",
+            "",
+            f"# {title}",
+            "",
+            f"- [[{cfg.group_index.with_suffix('').as_posix()}]]",
+            f"- [[{cfg.moc.with_suffix('').as_posix()}]]",
+            "",
+            "## Entries",
+            "",
+        ]
+    )
+
+
+# Parsed index lines keyed by path, reused while the file's mtime/size are unchanged so a
+# batch run does not re-read every Knowledge Index for each item.
+_INDEX_LINES_CACHE: Dict[Path, Tuple[Tuple[int, int], List[str]]] = {}
+
+
+def read_index_lines(index_path: Path) -> List[str]:
+    stat = index_path.stat()
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    cached = _INDEX_LINES_CACHE.get(index_path)
+    if cached and cached[0] == stamp:
+        return cached[1]
+    lines = index_path.read_text(encoding="utf-8").splitlines()
+    _INDEX_LINES_CACHE[index_path] = (stamp, lines)
+    return lines
+
+
+class SourceIndex:
+    """Persistent source URL -> Knowledge Index entry lookup kept in ``.cache/source_index.json``.
+
+    Entries are keyed by ``canonical_url``, so an arXiv pdf link or a URL carrying tracking
+    parameters finds the note written for the plain abs page; each entry also keeps the source
+    URL as the index line spells it.
+
+    The sidecar records the (mtime, size) stamp of every group index it was built from; when any
+    stamp differs (hand edits, git checkouts, another ingestor) it is rebuilt from the Markdown
+    indexes. Upserts update it in place and it is written back once per run by ``flush``.
+    """
+
+    VERSION = 3
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._entries: Optional[Dict[str, List[object]]] = None
+        self._stamps: Dict[str, List[int]] = {}
+        self._dirty = False
+
+    @staticmethod
+    def _stamp(index_path: Path) -> List[int]:
+        stat = index_path.stat()
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def _current_stamps(self) -> Dict[str, List[int]]:
+        stamps: Dict[str, List[int]] = {}
+        for cfg in GROUPS.values():
+            index_path = ROOT / cfg.knowledge_index
+            if index_path.exists():
+                stamps[cfg.knowledge_index.as_posix()] = self._stamp(index_path)
+        return stamps
+
+    def _load(self) -> Dict[str, List[object]]:
+        if self._entries is not None:
+            return self._entries
+        with TRACER.span("source_index_load", "index") as span:
+            self._entries = self._read_or_rebuild()
+            span["entries"] = len(self._entries)
+        return self._entries
+
+    def _read_or_rebuild(self) -> Dict[str, List[object]]:
+        stamps = self._current_stamps()
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if data.get("version") == self.VERSION and data.get("stamps") == stamps:
+                self._entries = data["entries"]
+                self._stamps = stamps
+                return self._entries
+        except (OSError, ValueError, KeyError):
+            pass
+        return self.rebuild()
+
+    def refresh(self) -> None:
+        """Unload the entries if any group index changed on disk since they were read.
+
+        For long-running processes: the next lookup then reloads them. Only call it with the
+        vault flushed, since entries recorded after the last ``VAULT.flush`` would be dropped;
+        ``watch`` flushes after every round of work.
+        """
+        if self._entries is not None and self._current_stamps() != self._stamps:
+            self._entries = None
+
+    def rebuild(self) -> Dict[str, List[object]]:
+        entries: Dict[str, List[object]] = {}
+        for group, cfg in GROUPS.items():
+            index_path = ROOT / cfg.knowledge_index
+            if not index_path.exists():
+                continue
+            for line in read_index_lines(index_path):
+                match = ENTRY_RE.match(line.strip())
+                if not match:
+                    continue
+                source = canonical_url(match.group("source"))
+                if source in entries:
+                    continue
+                note_path = (index_path.parent / match.group("path")).resolve()
+                citations_raw = match.group("citations")
+                entries[source] = [
+                    group,
+                    note_path.relative_to(ROOT).as_posix() if note_path.is_relative_to(ROOT) else note_path.as_posix(),
+                    match.group("title"),
+                    match.group("level"),
+                    int(citations_raw) if citations_raw else 0,
+                    match.group("source"),
+                ]
+        self._entries = entries
+        self._stamps = self._current_stamps()
+        self._dirty = True
+        return entries
+
+    def lookup(self, source_url: str) -> Optional[Tuple[str, GroupConfig, Path, str, str, int, str]]:
+        """Group, config, note path, title, level, citations and indexed source URL of a source's entry."""
+        entry = self._load().get(canonical_url(source_url))
+        if entry is None:
+            return None
+        group, rel_path, title, level, citations, source = entry
+        return (str(group), GROUPS[str(group)], (ROOT / str(rel_path)).resolve(), str(title), str(level), int(citations), str(source))  # type: ignore[arg-type]
+
+    def lookup_note(self, note_path: Path) -> Optional[Tuple[str, str, str]]:
+        """Group, title and level of the first entry pointing at ``note_path`` (a linear scan)."""
+        rel_path = note_path.relative_to(ROOT).as_posix()
+        for group, path, title, level, *_ in self._load().values():
+            if path == rel_path:
+                return str(group), str(title), str(level)
+        return None
+
+    def record(self, group: str, cfg: GroupConfig, note_path: Path, title: str, level: str, source_url: str, citations: int) -> None:
+        entries = self._load()
+        key = canonical_url(source_url)
+        current = entries.get(key)
+        order = list(GROUPS)
+        # lookups resolve to the first group (in GROUPS order) whose index lists the source
+        if current is None or order.index(str(current[0])) >= order.index(group):
+            entries[key] = [group, note_path.relative_to(ROOT).as_posix(), title, level, citations, source_url]
+        self._dirty = True
+
+    def sync_stamp(self, index_path: Path, before: Optional[List[int]]) -> None:
+        """Adopt the stamp of an index this process just flushed.
+
+        ``before`` is the stamp seen under the vault lock before the write; if it is not the one
+        the sidecar was built from, someone else changed the index and the old stamp is kept so
+        the next run rebuilds.
+        """
+        key = index_path.relative_to(ROOT).as_posix()
+        if self._entries is None or self._stamps.get(key) != before:
+            return
+        self._stamps[key] = self._stamp(index_path)
+        self._dirty = True
+
+    def flush(self) -> None:
+        if not self._dirty or self._entries is None:
+            return
+        payload = {"version": self.VERSION, "stamps": self._stamps, "entries": self._entries}
+        write_bytes_atomic(self.path, json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+        self._dirty = False
+
+
+SOURCE_INDEX = SourceIndex(CACHE_DIR / "source_index.json")
+
+
+def merge_index_entries(lines: List[str], entries: Dict[str, str]) -> str:
+    """Replace index lines whose source is in ``entries`` and append the rest under ``## Entries``.
+
+    Sources are compared by ``canonical_url``; only the first matching line is replaced.
+    """
+    remaining = {canonical_url(source): line for source, line in entries.items()}
+    new_lines: List[str] = []
+    for current in lines:
+        match = ENTRY_RE.match(current.strip())
+        source = canonical_url(match.group("source")) if match else None
+        if source is not None and source in remaining:
+            new_lines.append(remaining.pop(source))
+        else:
+            new_lines.append(current)
+
+    updated = "\n".join(new_lines).rstrip()
+    if remaining:
+        if "## Entries" not in updated:
+            updated = updated + "\n\n## Entries\n"
+        updated = updated + "\n" + "\n".join(remaining.values())
+    return updated
+
+
+class VaultWriter:
+    """Write layer for notes and Knowledge Index files.
+
+    Every file is replaced atomically (temp file + ``os.replace``), so a crash never leaves a
+    torn note or index. Index upserts are buffered per index and applied by ``flush``, which
+    re-reads each index under an exclusive lock, merges the pending entries and replaces it
+    once: a batch rewrites each index a single time and concurrent ingestors keep each
+    other's entries. Entries still buffered when a run dies are recovered by resuming it
+    (see ``JobJournal``).
+    """
+
+    def __init__(self, lock_path: Path) -> None:
+        self.lock_path = lock_path
+        self._pending: Dict[Path, Dict[str, str]] = {}
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.lock_path.open("a") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+    def write_note(self, path: Path, content: str) -> None:
+        write_bytes_atomic(path, content.encode("utf-8"))
+        SEARCH_INDEX.update(path, content)
+        SIMILARITY_INDEX.update(path, content)
+        CENTROIDS.update(path, content)
+
+    def create_file(self, path: Path, content: str) -> None:
+        with self.lock():
+            if not path.exists():
+                write_bytes_atomic(path, content.encode("utf-8"))
+
+    def queue_index_entry(self, index_path: Path, source_url: str, line: str) -> None:
+        self._pending.setdefault(index_path, {})[source_url] = line
+
+    def flush(self) -> List[Path]:
+        """Apply buffered index entries; returns the indexes whose content changed."""
+        if not self._pending:
+            return []
+        written: List[Path] = []
+        with TRACER.span("index_flush", "index", indexes=len(self._pending)), self.lock():
+            for index_path, entries in self._pending.items():
+                before = SourceIndex._stamp(index_path)
+                lines = read_index_lines(index_path)
+                updated = merge_index_entries(lines, entries)
+                if updated != "\n".join(lines).rstrip():
+                    write_bytes_atomic(index_path, (updated + "\n").encode("utf-8"))
+                    written.append(index_path)
+                SOURCE_INDEX.sync_stamp(index_path, before)
+        self._pending.clear()
+        return written
+
+
+VAULT = VaultWriter(CACHE_DIR / "vault.lock")
+
+
+def find_existing_entry_by_source(source_url: str) -> Optional[Tuple[str, GroupConfig, Path, str, str, int, str]]:
+    return SOURCE_INDEX.lookup(source_url)
+
+
+def index_entry_line(title: str, rel_note: Path, level: str, source_url: str, citations_count: int) -> str:
+    return f"- [ ] [{title}]({rel_note.as_posix()}) - level: {level} - source: {source_url} - citations: {citations_count}"
+
+
+def upsert_knowledge_index_entry(
+    cfg: GroupConfig,
+    title: str,
+    note_dir: Path,
+    level: str,
+    source_url: str,
+    citations_count: int,
+) -> None:
+    index_path = ROOT / cfg.knowledge_index
+    line = index_entry_line(title, (note_dir / "README.md").relative_to(index_path.parent), level, source_url, citations_count)
+
+    VAULT.queue_index_entry(index_path, canonical_url(source_url), line)
+    group = next(name for name, group_cfg in GROUPS.items() if group_cfg == cfg)
+    SOURCE_INDEX.record(group, cfg, note_dir / "README.md", title, level, source_url, citations_count)
+
+
+def read_frontmatter(path: Path) -> Dict[str, str]:
+    try:
+        text = path.read_text(encoding="utf-8")
+    except OSError:
+        return {}
+    return parse_frontmatter(text)
+
+
+def parse_frontmatter(text: str) -> Dict[str, str]:
+    match = FRONTMATTER_RE.match(text)
+    if not match:
+        return {}
+    fields: Dict[str, str] = {}
+    for line in match.group("body").splitlines():
+        key, sep, value = line.partition(":")
+        if sep:
+            fields[key.strip()] = value.strip().strip('"')
+    return fields
+
+
+SEARCH_TOKEN_RE = re.compile(r"[a-z0-9]+")
+HEADING_RE = re.compile(r"^#{1,6}\s+(.+?)\s*$", re.M)
+
+
+def search_tokens(text: str) -> List[str]:
+    # same tokens as clean_text(text).lower(), minus the whitespace pass the pattern makes moot
+    return SEARCH_TOKEN_RE.findall(unescape(text).lower())
+
+
+def note_tags(fields: Dict[str, str]) -> List[str]:
+    return [tag.strip() for tag in fields.get("tags", "").strip("[]").split(",") if tag.strip()]
+
+
+class SearchIndex:
+    """BM25 full-text index over the group folders' notes, kept under ``.cache/search``.
+
+    The base segment is immutable and memory-mapped: ``lexicon.bin`` holds sorted (term offset,
+    postings offset, document count) uint32 triples into ``terms.bin`` and ``postings.bin``
+    ((doc, tf) uint32 pairs), so each query term costs one binary search and one slice.
+    Notes written or edited since the last build live in a small ``delta.json`` segment that
+    shadows their base entry; past ``COMPACT_AFTER`` notes the segments are rebuilt.
+    Navigation notes (tagged ``index``) are not indexed, only stamped so edits are noticed.
+    """
+
+    VERSION = 1
+    COMPACT_AFTER = 256
+    HEADING_WEIGHT = 3
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        # doc meta: [path, title, domain, level, length, mtime_ns, size]
+        self._docs: Optional[List[List[object]]] = None
+        self._by_path: Dict[str, int] = {}
+        self._skipped: Dict[str, List[int]] = {}
+        self._total_length = 0
+        self._delta: Optional[Dict[str, Optional[Dict[str, object]]]] = None
+        self._lexicon: memoryview = memoryview(array.array("I"))
+        self._terms: memoryview = memoryview(b"")
+        self._postings: memoryview = memoryview(array.array("I"))
+        self._maps: List[mmap.mmap] = []
+        self._dirty = False
+
+    @staticmethod
+    def note_paths() -> Dict[str, Tuple[str, List[int]]]:
+        """Every note under the group folders as {vault-relative path: (file path, [mtime_ns, size])}."""
+        found: Dict[str, Tuple[str, List[int]]] = {}
+        pending = [str(ROOT / top) for top in dict.fromkeys(cfg.knowledge_dir.parts[0] for cfg in GROUPS.values())]
+        prefix = len(str(ROOT)) + 1
+        while pending:
+            try:
+                entries = list(os.scandir(pending.pop()))
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_dir():
+                        pending.append(entry.path)
+                    elif entry.name.endswith(".md") and entry.is_file():
+                        stat = entry.stat()
+                        rel_path = entry.path[prefix:].replace(os.sep, "/")
+                        found[rel_path] = (entry.path, [stat.st_mtime_ns, stat.st_size])
+                except OSError:
+                    continue
+        return dict(sorted(found.items()))
+
+    @classmethod
+    def analyze(cls, rel_path: str, text: str) -> Optional[Tuple[List[object], Counter[str]]]:
+        """Document meta and weighted term frequencies, or None for notes that are not indexed."""
+        fields = parse_frontmatter(text)
+        tags = note_tags(fields)
+        if "index" in tags:
+            return None
+        match = FRONTMATTER_RE.match(text)
+        body = text[match.end() :] if match else text
+        headings = HEADING_RE.findall(body)
+        frequencies = Counter(search_tokens(body))
+        for heading in headings:
+            for token in search_tokens(heading):
+                frequencies[token] += cls.HEADING_WEIGHT - 1
+        for value in fields.values():
+            frequencies.update(search_tokens(value))
+        title = clean_text(headings[0]) if headings else Path(rel_path).parent.name
+        level = next((tag for tag in tags if tag in LEVEL_KEYWORDS), "")
+        meta: List[object] = [rel_path, title, fields.get("domain", ""), level, sum(frequencies.values()), 0, 0]
+        return meta, frequencies
+
+    def _analyze_file(
+        self, path: Path, text: Optional[str] = None
+    ) -> Tuple[Optional[List[int]], Optional[Tuple[List[object], Counter[str]]]]:
+        """The file's (mtime, size) stamp and analysis; the stamp is None when it cannot be read."""
+        try:
+            stat = path.stat()
+            if text is None:
+                text = path.read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            return None, None
+        stamp = [stat.st_mtime_ns, stat.st_size]
+        analyzed = self.analyze(path.relative_to(ROOT).as_posix(), text)
+        if analyzed:
+            analyzed[0][5:7] = stamp
+        return stamp, analyzed
+
+    def build(self) -> int:
+        """Rebuild the base segment from every note on disk; returns the number of notes indexed."""
+        docs: List[List[object]] = []
+        skipped: Dict[str, List[int]] = {}
+        # term -> flat (doc, tf, doc, tf, ...) run, already in the on-disk layout
+        postings: Dict[str, array.array] = {}
+        for rel_path, (path, _) in self.note_paths().items():
+            stamp, analyzed = self._analyze_file(Path(path))
+            if analyzed is None:
+                if stamp is not None:
+                    skipped[rel_path] = stamp
+                continue
+            meta, frequencies = analyzed
+            doc = len(docs)
+            for term, frequency in frequencies.items():
+                run = postings.get(term)
+                if run is None:
+                    run = postings[term] = array.array("I")
+                run.append(doc)
+                run.append(frequency)
+            docs.append(meta)
+
+        terms = bytearray()
+        lexicon = array.array("I")
+        flat = array.array("I")
+        for key, term in sorted((term.encode("utf-8"), term) for term in postings):
+            run = postings[term]
+            lexicon.extend((len(terms), len(flat) // 2, len(run) // 2))
+            terms += key
+            flat.extend(run)
+        lexicon.append(len(terms))  # sentinel: end of the last term
+
+        self.close()
+        write_bytes_atomic(self.root / "terms.bin", bytes(terms))
+        write_bytes_atomic(self.root / "lexicon.bin", lexicon.tobytes())
+        write_bytes_atomic(self.root / "postings.bin", flat.tobytes())
+        (self.root / "delta.json").unlink(missing_ok=True)
+        # docs.json goes last: it marks the segment complete
+        payload = {"version": self.VERSION, "docs": docs, "skipped": skipped}
+        write_bytes_atomic(self.root / "docs.json", json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+        self._docs = None
+        self._delta = None
+        self._load()
+        return len(docs)
+
+    def _map(self, name: str, fmt: Optional[str] = None) -> memoryview:
+        with (self.root / name).open("rb") as handle:
+            if os.fstat(handle.fileno()).st_size == 0:
+                return memoryview(array.array("I") if fmt else b"")
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mapped)
+        view = memoryview(mapped)
+        return view.cast(fmt) if fmt else view
+
+    def _load(self) -> None:
+        if self._docs is not None:
+            return
+        try:
+            data = json.loads((self.root / "docs.json").read_text(encoding="utf-8"))
+            if data.get("version") != self.VERSION:
+                raise ValueError("index format changed")
+            self._lexicon = self._map("lexicon.bin", "I")
+            self._terms = self._map("terms.bin")
+            self._postings = self._map("postings.bin", "I")
+        except (OSError, ValueError, KeyError):
+            self.build()
+            return
+        self._docs = data["docs"]
+        self._skipped = data.get("skipped", {})
+        self._by_path = {str(meta[0]): position for position, meta in enumerate(self._docs)}
+        self._total_length = sum(int(meta[4]) for meta in self._docs)  # type: ignore[call-overload]
+
+    def _load_delta(self) -> Dict[str, Optional[Dict[str, object]]]:
+        if self._delta is None:
+            try:
+                self._delta = json.loads((self.root / "delta.json").read_text(encoding="utf-8"))["docs"]
+            except (OSError, ValueError, KeyError):
+                self._delta = {}
+        return self._delta  # type: ignore[return-value]
+
+    def close(self) -> None:
+        self._lexicon = memoryview(array.array("I"))
+        self._terms = memoryview(b"")
+        self._postings = memoryview(array.array("I"))
+        for mapped in self._maps:
+            try:
+                mapped.close()
+            except BufferError:
+                pass  # a caller still holds a slice; the map goes with it
+        self._maps = []
+
+    def update(self, path: Path, text: Optional[str] = None) -> None:
+        """Record a written note in the delta segment (no-op until the index has been built)."""
+        if not (self.root / "docs.json").exists():
+            return
+        try:
+            rel_path = path.resolve().relative_to(ROOT)
+        except ValueError:
+            return
+        if rel_path.parts[0] not in {cfg.knowledge_dir.parts[0] for cfg in GROUPS.values()} or path.suffix != ".md":
+            return
+        stamp, analyzed = self._analyze_file(path, text)
+        entry: Optional[Dict[str, object]] = None
+        if stamp is not None:
+            entry = {"stamp": stamp, "meta": analyzed[0] if analyzed else None, "tf": dict(analyzed[1]) if analyzed else {}}
+        self._load_delta()[rel_path.as_posix()] = entry
+        self._dirty = True
+
+    def refresh(self) -> int:
+        """Pick up notes added, edited or removed outside the ingestor; returns how many changed."""
+        self._load()
+        delta = self._load_delta()
+        changed = 0
+        on_disk = self.note_paths()
+        for rel_path, (path, stamp) in on_disk.items():
+            if rel_path in delta:
+                entry = delta[rel_path]
+                known = entry["stamp"] if entry else None
+            elif rel_path in self._by_path:
+                known = self._docs[self._by_path[rel_path]][5:7]  # type: ignore[index]
+            else:
+                known = self._skipped.get(rel_path)
+            if known != stamp:
+                self.update(Path(path))
+                changed += 1
+        for rel_path in [*self._by_path, *delta]:
+            if rel_path not in on_disk and delta.get(rel_path, ...) is not None:
+                delta[rel_path] = None
+                self._dirty = True
+                changed += 1
+        return changed
+
+    def flush(self) -> None:
+        if not self._dirty:
+            return
+        delta = self._load_delta()
+        if len(delta) > self.COMPACT_AFTER:
+            self.build()
+        else:
+            write_bytes_atomic(self.root / "delta.json", json.dumps({"docs": delta}, separators=(",", ":")).encode("utf-8"))
+        self._dirty = False
+
+    def _find_term(self, term: str) -> Optional[Tuple[int, int]]:
+        key = term.encode("utf-8")
+        lexicon, terms = self._lexicon, self._terms
+        low, high = 0, (len(lexicon) - 1) // 3
+        while low < high:
+            middle = (low + high) // 2
+            current = bytes(terms[lexicon[3 * middle] : lexicon[3 * middle + 3]])
+            if current < key:
+                low = middle + 1
+            elif current > key:
+                high = middle
+            else:
+                return lexicon[3 * middle + 1], lexicon[3 * middle + 2]
+        return None
+
+    def search(
+        self, query: str, domain: Optional[str] = None, level: Optional[str] = None, limit: int = 10
+    ) -> Tuple[List[Tuple[float, List[object]]], int]:
+        """Rank notes for ``query`` with BM25; returns the top ``limit`` and the number of matches."""
+        self._load()
+        docs = self._docs or []
+        delta = self._load_delta()
+        shadowed = {self._by_path[path] for path in delta if path in self._by_path}
+        live_delta = [entry for entry in delta.values() if entry and entry["meta"]]
+        count = len(docs) - len(shadowed) + len(live_delta)
+        if count == 0:
+            return [], 0
+        total = self._total_length - sum(int(docs[position][4]) for position in shadowed)  # type: ignore[call-overload]
+        total += sum(int(entry["meta"][4]) for entry in live_delta)  # type: ignore[index]
+        average = total / count or 1.0
+
+        def wanted(meta: List[object]) -> bool:
+            return (not domain or meta[2] == domain) and (not level or meta[3] == level)
+
+        scores: Dict[str, Tuple[float, List[object]]] = {}
+        for term in dict.fromkeys(search_tokens(query)):
+            hits: List[Tuple[List[object], int]] = []
+            found = self._find_term(term)
+            if found:
+                start, size = found
+                pairs = self._postings[2 * start : 2 * (start + size)]
+                hits.extend((docs[doc], frequency) for doc, frequency in zip(pairs[0::2], pairs[1::2]) if doc not in shadowed)
+            hits.extend((entry["meta"], entry["tf"][term]) for entry in live_delta if term in entry["tf"])  # type: ignore[index,operator]
+            if not hits:
+                continue
+            idf = math.log(1 + (count - len(hits) + 0.5) / (len(hits) + 0.5))
+            for meta, frequency in hits:
+                if not wanted(meta):
+                    continue
+                norm = self.K1 * (1 - self.B + self.B * int(meta[4]) / average)  # type: ignore[call-overload]
+                gain = idf * frequency * (self.K1 + 1) / (frequency + norm)
+                previous = scores.get(str(meta[0]))
+                scores[str(meta[0])] = ((previous[0] if previous else 0.0) + gain, meta)
+        ranked = sorted(scores.values(), key=lambda hit: (-hit[0], str(hit[1][0])))
+        return ranked[:limit], len(ranked)
+
+
+SEARCH_INDEX = SearchIndex(CACHE_DIR / "search")
+
+
+def note_shingles(text: str) -> set[int]:
+    """CRC32 hashes of the word trigrams (4+ letter words) of a note body, frontmatter excluded."""
+    match = FRONTMATTER_RE.match(text)
+    words = SIGNATURE_TOKEN_RE.findall((text[match.end() :] if match else text).lower())
+    return set(map(zlib.crc32, map(str.encode, map(" ".join, zip(words, words[1:], words[2:])))))
+
+
+def blank_note_texts() -> Iterator[str]:
+    """Every variant of the note template rendered without source content."""
+    for cfg in GROUPS.values():
+        for level in LEVEL_KEYWORDS:
+            for kind in ("resource", "topic"):
+                for limited in (False, True):
+                    blank = SourceRecord("", "", "", [], [], [], limited, None)
+                    yield build_note_content(cfg, "", level, blank, [], kind, "", [])
+
+
+def sketch_similarity(first: List[int], second: List[int]) -> float:
+    """Jaccard estimate from two bottom-k sketches: the shared fraction of their union's k smallest."""
+    union = sorted(set(first) | set(second))[:NOTE_SKETCH_SIZE]
+    if not union:
+        return 0.0
+    shared = set(first) & set(second)
+    return sum(1 for value in union if value in shared) / len(union)
+
+
+class NoteSimilarityIndex:
+    """Content sketches of the ingested notes, kept in ``.cache/note_sketches.json``.
+
+    Every ``README.md`` note under a group's knowledge folder is reduced to a bottom-k MinHash
+    sketch of its word trigrams, minus the trigrams ``build_note_content`` emits for any note, and
+    filed under each sketch value. A new note is then compared only with the notes it shares a
+    minimum with. Values shared by more than ``BUCKET_LIMIT`` notes (stock phrases) are not used
+    to find candidates. Sketches are recomputed only for notes whose (mtime, size) stamp changed.
+    """
+
+    VERSION = 1
+    BUCKET_LIMIT = 64
+    MIN_SHINGLES = 16
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        # rel path -> [stamp, sketch]
+        self._notes: Optional[Dict[str, List[List[int]]]] = None
+        self._buckets: Dict[int, List[str]] = {}
+        self._template: Optional[set[int]] = None
+        self._dirty = False
+
+    def template_shingles(self) -> set[int]:
+        if self._template is None:
+            self._template = set()
+            for text in blank_note_texts():
+                self._template |= note_shingles(text)
+        return self._template
+
+    def sketch(self, text: str) -> List[int]:
+        shingles = note_shingles(text) - self.template_shingles()
+        if len(shingles) < self.MIN_SHINGLES:
+            return []
+        return sorted(shingles)[:NOTE_SKETCH_SIZE]
+
+    @staticmethod
+    def _rel_path(path: Path) -> Optional[str]:
+        try:
+            rel_path = path.resolve().relative_to(ROOT)
+        except ValueError:
+            return None
+        if path.name != "README.md" or not any(rel_path.parent.parent == cfg.knowledge_dir for cfg in GROUPS.values()):
+            return None
+        return rel_path.as_posix()
+
+    def _load(self) -> Dict[str, List[List[int]]]:
+        if self._notes is not None:
+            return self._notes
+        with TRACER.span("note_sketches_load", "index") as span:
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                cached = data["notes"] if data.get("version") == [self.VERSION, NOTE_FORMAT_VERSION] else {}
+            except (OSError, ValueError, KeyError):
+                cached = {}
+            notes: Dict[str, List[List[int]]] = {}
+            for cfg in GROUPS.values():
+                for path in (ROOT / cfg.knowledge_dir).glob("*/README.md"):
+                    rel_path = path.relative_to(ROOT).as_posix()
+                    try:
+                        stat = path.stat()
+                        stamp = [stat.st_mtime_ns, stat.st_size]
+                        known = cached.get(rel_path)
+                        notes[rel_path] = known if known and known[0] == stamp else [stamp, self.sketch(path.read_text(encoding="utf-8"))]
+                    except (OSError, UnicodeDecodeError):
+                        continue
+            self._dirty = notes != cached
+            self._notes = {}
+            for rel_path, (stamp, sketch) in notes.items():
+                self._add(self._notes, rel_path, stamp, sketch)
+            span["notes"] = len(notes)
+        return self._notes
+
+    def _add(self, notes: Dict[str, List[List[int]]], rel_path: str, stamp: List[int], sketch: List[int]) -> None:
+        previous = notes.get(rel_path)
+        for value in previous[1] if previous else ():
+            self._buckets[value].remove(rel_path)
+        notes[rel_path] = [stamp, sketch]
+        for value in sketch:
+            self._buckets.setdefault(value, []).append(rel_path)
+
+    def update(self, path: Path, text: str) -> None:
+        """Re-sketch a note this process wrote (no-op until loaded: the stamp check catches it then)."""
+        rel_path = self._rel_path(path)
+        if self._notes is None or rel_path is None:
+            return
+        try:
+            stat = path.stat()
+        except OSError:
+            return
+        self._add(self._notes, rel_path, [stat.st_mtime_ns, stat.st_size], self.sketch(text))
+        self._dirty = True
+
+    def find(self, text: str, threshold: float = NOTE_DUPLICATE_THRESHOLD) -> Optional[Tuple[Path, float]]:
+        """The indexed note most similar to ``text`` if its estimated Jaccard reaches ``threshold``."""
+        notes = self._load()
+        sketch = self.sketch(text)
+        candidates = {
+            rel_path
+            for value in sketch
+            if len(self._buckets.get(value, ())) <= self.BUCKET_LIMIT
+            for rel_path in self._buckets.get(value, ())
+        }
+        best = max(((sketch_similarity(sketch, notes[rel_path][1]), rel_path) for rel_path in candidates), default=None)
+        if best is None or best[0] < threshold:
+            return None
+        return ROOT / best[1], best[0]
+
+    def flush(self) -> None:
+        if not self._dirty or self._notes is None:
+            return
+        payload = {"version": [self.VERSION, NOTE_FORMAT_VERSION], "notes": self._notes}
+        write_bytes_atomic(self.path, json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+        self._dirty = False
+
+
+SIMILARITY_INDEX = NoteSimilarityIndex(CACHE_DIR / "note_sketches.json")
+
+
+@dataclass
+class Snapshot:
+    record: SourceRecord
+    html: bytes
+    charset: Optional[str]
+    captured: str
+
+
+class SnapshotPack:
+    """Parsed source records and their raw HTML, kept in ``.cache/snapshots`` for offline re-synthesis.
+
+    ``pack.bin`` is an append-only run of zlib-compressed blobs (the record as one JSON line, then
+    the HTML), each distinct content digest stored once. ``index.bin`` is memory-mapped: a header
+    and ``ENTRY`` rows sorted by the hash of the canonical URL, each pointing at the URL's latest
+    blob and the date that content was first captured, so a lookup is one binary search and one
+    read. New snapshots are buffered and appended under the vault lock by ``flush``.
+    """
+
+    VERSION = 1
+    MAGIC = b"KSNP"
+    HEADER = struct.Struct("<4sII")  # magic, version, entry count
+    ENTRY = struct.Struct("<16s16sQII")  # url key, content digest, offset, length, captured (date ordinal)
+    PENDING_LIMIT = 64 * 1024 * 1024
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.enabled = True
+        self._index: Optional[mmap.mmap] = None
+        self._count = 0
+        self._loaded = False
+        # url key -> (digest, compressed blob, captured)
+        self._pending: Dict[bytes, Tuple[bytes, bytes, int]] = {}
+        self._pending_bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def url_key(url: str) -> bytes:
+        return hashlib.blake2b(canonical_url(url).encode("utf-8"), digest_size=16).digest()
+
+    def add(self, record: SourceRecord, html: bytes, charset: Optional[str]) -> None:
+        if not self.enabled:
+            return
+        fields = {
+            "url": record.url,
+            "title": record.title,
+            "description": record.description,
+            "headings": list(record.headings),
+            "paragraphs": list(record.paragraphs),
+            "list_items": list(record.list_items),
+            "access_limited": record.access_limited,
+            "oembed_info": record.oembed_info,
+            "arxiv": asdict(record.arxiv) if record.arxiv else None,
+            "charset": charset,
+        }
+        payload = json.dumps(fields, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n" + html
+        digest = hashlib.blake2b(payload, digest_size=16).digest()
+        blob = zlib.compress(payload)
+        with self._lock:
+            previous = self._pending.get(self.url_key(record.url))
+            if previous is not None:
+                self._pending_bytes -= len(previous[1])
+            self._pending[self.url_key(record.url)] = (digest, blob, dt.date.today().toordinal())
+            self._pending_bytes += len(blob)
+            full = self._pending_bytes >= self.PENDING_LIMIT
+        if full:
+            self.flush()
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with (self.root / "index.bin").open("rb") as handle:
+                mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return
+        magic, version, count = self.HEADER.unpack_from(mapped) if len(mapped) >= self.HEADER.size else (b"", 0, 0)
+        if magic != self.MAGIC or version != self.VERSION or len(mapped) != self.HEADER.size + count * self.ENTRY.size:
+            mapped.close()
+            return
+        self._index, self._count = mapped, count
+
+    def _close(self) -> None:
+        if self._index is not None:
+            self._index.close()
+        self._index, self._count, self._loaded = None, 0, False
+
+    def _rows(self) -> Iterator[Tuple[bytes, bytes, int, int, int]]:
+        if self._index is not None:
+            yield from self.ENTRY.iter_unpack(memoryview(self._index)[self.HEADER.size :])  # type: ignore[misc]
+
+    def _find(self, key: bytes) -> Optional[Tuple[bytes, bytes, int, int, int]]:
+        index = self._index
+        if index is None:
+            return None
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            start = self.HEADER.size + middle * self.ENTRY.size
+            current = index[start : start + 16]
+            if current < key:
+                low = middle + 1
+            elif current > key:
+                high = middle
+            else:
+                return self.ENTRY.unpack_from(index, start)  # type: ignore[return-value]
+        return None
+
+    def get(self, url: str) -> Optional[Snapshot]:
+        """The latest snapshot of ``url`` or of any URL with the same canonical form."""
+        key = self.url_key(url)
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is not None:
+                blob, captured = pending[1], pending[2]
+            else:
+                self._load()
+                row = self._find(key)
+                if row is None:
+                    return None
+                _, _, offset, length, captured = row
+                with (self.root / "pack.bin").open("rb") as pack:
+                    pack.seek(offset)
+                    blob = pack.read(length)
+        header, _, html = zlib.decompress(blob).partition(b"\n")
+        fields = json.loads(header)
+        arxiv = fields.pop("arxiv")
+        charset = fields.pop("charset")
+        record = SourceRecord(**fields, arxiv=ArxivEntry(**arxiv) if arxiv else None)
+        return Snapshot(record, html, charset, dt.date.fromordinal(captured).isoformat())
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending, self._pending_bytes = self._pending, {}, 0
+            if not pending:
+                return
+            with VAULT.lock():
+                # re-read the index under the lock: another process may have flushed since it was mapped
+                self._close()
+                self._load()
+                rows = {row[0]: row for row in self._rows()}
+                stored = {row[1]: (row[2], row[3]) for row in rows.values()}
+                self.root.mkdir(parents=True, exist_ok=True)
+                with (self.root / "pack.bin").open("ab") as pack:
+                    offset = pack.tell()
+                    for key, (digest, blob, captured) in pending.items():
+                        location = stored.get(digest)
+                        if location is None:
+                            pack.write(blob)
+                            location = stored[digest] = (offset, len(blob))
+                            offset += len(blob)
+                        known = rows.get(key)
+                        if known is not None and known[1] == digest:
+                            captured = known[4]
+                        rows[key] = (key, digest, *location, captured)
+                data = bytearray(self.HEADER.pack(self.MAGIC, self.VERSION, len(rows)))
+                for row in sorted(rows.values()):
+                    data += self.ENTRY.pack(*row)
+                self._close()
+                write_bytes_atomic(self.root / "index.bin", bytes(data))
+
+
+SNAPSHOTS = SnapshotPack(CACHE_DIR / "snapshots")
+
+
+def source_fingerprint(record: SourceRecord) -> str:
+    """Digest of everything extracted from one source that can influence a note."""
+    if record.fingerprint is not None:
+        return record.fingerprint
+    payload = json.dumps(
+        [
+            record.url,
+            record.title,
+            record.description,
+            list(record.headings),
+            list(record.paragraphs),
+            list(record.list_items),
+            record.access_limited,
+            record.oembed_info,
+        ],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def note_fingerprint(records: List[SourceRecord], *params: str) -> str:
+    """Combined digest of every source fingerprint plus the note's own parameters (not its dates)."""
+    payload = json.dumps([NOTE_FORMAT_VERSION, [source_fingerprint(rec) for rec in records], list(params)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def build_bibliography(records: List[SourceRecord], min_citations: int) -> List[Tuple[str, str]]:
+    items: List[Tuple[str, str]] = []
+    seen = set()
+    for rec in records:
+        url = rec.url
+        if url in seen:
+            continue
+        seen.add(url)
+        title = rec.title or urllib.parse.urlparse(url).netloc
+        items.append((title, url))
+
+    if len(items) < min_citations:
+        raise ValueError(
+            f"Need at least {min_citations} citations but only {len(items)} sources available. "
+            "Add more --extra-source entries."
+        )
+    return items
+
+
+def build_note_content(
+    cfg: GroupConfig,
+    title: str,
+    level: str,
+    primary: SourceRecord,
+    bibliography: List[Tuple[str, str]],
+    kind: str,
+    topic_id: str,
+    corroborating: Optional[List[SourceRecord]] = None,
+    fingerprint: str = "",
+) -> str:
+    if corroborating is not None:
+        records = [primary, *corroborating]
+    else:
+        records = [primary]
+        for src_title, src_url in bibliography[1:]:
+            records.append(SourceRecord(src_url, src_title, "", [], [], [], False, None))
+
+    pool = SentencePool()
+    for rec in records:
+        if rec.sentences is None:
+            # kept on the record: corroborating sources are shared between notes in a batch
+            rec.sentences = TextBlocks(extract_content_sentences(rec.description, rec.paragraphs, rec.list_items))
+        pool.extend(rec.sentences)
+    selected = pick_distinct_sentences(pool.sentences, 18, pool.signatures)
+    level_article = "an" if level[:1].lower() in {"a", "e", "i", "o", "u"} else "a"
+
+    def synth(start: int, take: int, fallback: str) -> str:
+        chunk = selected[start : start + take]
+        if chunk:
+            return " ".join(chunk)
+        return fallback
+
+    if primary.access_limited:
+        embed_text = (primary.oembed_info or {}).get("embed_text", "")
+        author = (primary.oembed_info or {}).get("author_name", "")
+        provider = (primary.oembed_info or {}).get("provider_name", "the platform")
+
+        abstract = (
+            "This note preserves a source that is partially inaccessible to static scraping. "
+            f"It is still documented as {level_article} {level}-level {kind} entry in the `{cfg.domain}` track."
+        )
+        context = (
+            f"The primary source requires dynamic rendering, so the research pass relies on metadata and corroborating citations. "
+            f"Available platform metadata indicates authorship by {author or 'an identified account'} on {provider}."
+        )
+        method = (
+            "Synthesis was built by combining recoverable metadata with corroborating technical sources listed in the bibliography. "
+            "This maintains traceability while avoiding fabricated details."
+        )
+        findings = (
+            f"Recoverable metadata from the primary source: {embed_text}. "
+            "Corroborating references were used to anchor broader interpretation and follow-up analysis."
+        )
+        critique = (
+            "Evidence quality is lower when the primary source is dynamically gated. "
+            "Treat this as a directional research node and enrich manually with verbatim source text when available."
+        )
+    else:
+        heading_overview = ", ".join([h for h in primary.headings if not is_noise(h)][:4])
+        abstract = (
+            f"{primary.description or synth(0, 2, 'This resource presents a technical perspective relevant to this track.')} "
+            f"This dossier treats the material as {level_article} {level}-level knowledge and cross-checks it against corroborating sources."
+        )
+        context = (
+            f"The source frames the problem around {heading_overview or 'practical system constraints and design decisions'}. "
+            f"{synth(1, 2, 'The central challenge is balancing capability, reliability, and cost under real operating constraints.')}"
         )
         method = (
             "The synthesis compares claims across the primary source and additional references, then normalizes them into a systems-level narrative. "
@@ -663,6 +3394,7 @@ def build_note_content(
         "status: active",
         f"source_url: \"{primary.url}\"",
         f"kind: {kind}",
+        *([f"fingerprint: {fingerprint}"] if fingerprint else []),
         "---",
         "",
         f"# {title}",
@@ -704,31 +3436,184 @@ def build_note_content(
             "Record implementation evidence, benchmark outcomes, disagreements between sources, and open questions for follow-up.",
         ]
     )
-    return "\n".join(lines)
+    return "\n".join(lines)
+
+
+def add_ingest_options(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--kind", choices=["resource", "topic"], default="resource")
+    parser.add_argument("--topic-id", default="", help="Topic slug/path identifier for topic dossiers.")
+    parser.add_argument(
+        "--extra-source",
+        action="append",
+        default=[],
+        help="Additional corroborating source URL (repeatable).",
+    )
+    parser.add_argument("--min-citations", type=int, default=3)
+    parser.add_argument(
+        "--overwrite",
+        action="store_true",
+        help="Rewrite the note even when its source fingerprint shows nothing changed.",
+    )
+    parser.add_argument("--group", choices=["auto", *GROUPS.keys()], default="auto")
+    parser.add_argument(
+        "--level",
+        choices=["auto", "beginner", "intermediate", "advanced"],
+        default="auto",
+    )
+    parser.add_argument("--title", default="", help="Optional manual title override.")
+    parser.add_argument(
+        "--duplicates",
+        choices=["ask", "merge", "keep", "skip"],
+        default="ask",
+        help=(
+            "When a new note's content matches an existing note: ask (interactive runs; otherwise keep), "
+            "merge the source into the existing note's index entry, keep both notes, or skip (default: ask)."
+        ),
+    )
+    parser.add_argument(
+        "--extra-fetch",
+        choices=["full", "title"],
+        default="full",
+        help="Fetch corroborating sources in full (their text feeds the synthesis) or only read their titles.",
+    )
+    parser.add_argument("--dry-run", action="store_true")
+
+
+def add_run_options(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--workers", type=int, default=8, help="Maximum concurrent fetches (default: 8).")
+    parser.add_argument("--per-host", type=int, default=2, help="Maximum concurrent requests per host (default: 2).")
+    parser.add_argument(
+        "--host-delay",
+        type=float,
+        default=0.25,
+        help="Minimum seconds between request starts to the same host (default: 0.25).",
+    )
+    parser.add_argument(
+        "--cache-mode",
+        choices=CACHE_MODES,
+        default="use",
+        help="HTTP cache behaviour under .cache/http (default: use).",
+    )
+    parser.add_argument("--cache-ttl", type=float, default=168, help="Hours before a cached response is revalidated.")
+    parser.add_argument("--cache-max-mb", type=int, default=512, help="Cache size limit enforced by LRU eviction.")
+    parser.add_argument(
+        "--max-page-bytes",
+        type=int,
+        default=PAGE_MAX_BYTES,
+        help="Stop downloading a page after this many bytes (default: 5 MiB).",
+    )
+    parser.add_argument(
+        "--no-snapshots",
+        action="store_true",
+        help="Do not keep parsed sources in the snapshot pack used by the resynthesize command.",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=0,
+        help="Parse pages and extract their sentences in this many worker processes (default: 0, in the fetch threads).",
+    )
+    parser.add_argument(
+        "--near-duplicate",
+        type=float,
+        default=NEAR_DUPLICATE_THRESHOLD,
+        help="Token Jaccard similarity at which candidate sentences count as near-duplicates (default: 0.8).",
+    )
+    parser.add_argument(
+        "--classifier",
+        choices=("centroids", "keywords"),
+        default="centroids",
+        help="Infer group and level from centroids learned from the vault (needs NumPy), falling back to the "
+        "keyword tables, or from the keyword tables alone (default: centroids).",
+    )
+    parser.add_argument(
+        "--keywords",
+        type=Path,
+        default=None,
+        help='JSON keyword tables for classification: {"groups": {...}, "levels": {...}}.',
+    )
+    parser.add_argument(
+        "--fixtures",
+        type=Path,
+        default=FIXTURES.root,
+        help="Fixture directory for --record/--offline (default: .cache/fixtures).",
+    )
+    parser.add_argument("--trace", type=Path, default=None, help="Write per-stage timing spans to this file.")
+    parser.add_argument(
+        "--trace-format",
+        choices=("jsonl", "chrome"),
+        default="jsonl",
+        help="Trace file format: JSON lines or a Chrome trace for chrome://tracing / Perfetto (default: jsonl).",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="STATS",
+        help="Profile the run with cProfile and print the hottest functions; optionally save pstats to STATS.",
+    )
+    transport = parser.add_mutually_exclusive_group()
+    transport.add_argument("--record", action="store_true", help="Capture every network response into --fixtures.")
+    transport.add_argument("--offline", action="store_true", help="Replay responses from --fixtures; never touch the network.")
+    transport.add_argument(
+        "--fixture-server",
+        metavar="URL",
+        default=None,
+        help="Send every request through a scripts/fixture_server.py instance (e.g. http://127.0.0.1:8900).",
+    )
+
+
+def configure_run(args: argparse.Namespace) -> SourceFetcher:
+    global CLASSIFIER, NEAR_DUPLICATE_THRESHOLD, PAGE_MAX_BYTES
+    PAGE_MAX_BYTES = args.max_page_bytes
+    NEAR_DUPLICATE_THRESHOLD = args.near_duplicate
+    if args.keywords:
+        CLASSIFIER = KeywordClassifier.from_config(args.keywords)
+    CENTROIDS.enabled = np is not None and args.classifier == "centroids"
+    HOST_THROTTLE.per_host = args.per_host
+    HOST_THROTTLE.min_delay = args.host_delay
+    TRACER.path = args.trace
+    TRACER.format = args.trace_format
+    if args.profile is not None:
+        PROFILER.enabled = True
+        PROFILER.path = Path(args.profile) if args.profile else None
+        PROFILER.start_main()
+    FIXTURES.root = args.fixtures
+    FIXTURES.mode = "record" if args.record else "replay" if args.offline else "off"
+    FIXTURES.server = args.fixture_server
+    # fixture runs bypass the HTTP cache so every request hits the recorder, the fixtures or the server
+    HTTP_CACHE.mode = "off" if args.record or args.offline or args.fixture_server else args.cache_mode
+    HTTP_CACHE.ttl = args.cache_ttl * 3600
+    HTTP_CACHE.max_bytes = args.cache_max_mb * 1024 * 1024
+    SNAPSHOTS.enabled = not args.no_snapshots
+    PARSE_POOL.start(args.parse_workers)
+    # a fetch thread waits while its page is parsed, so keep enough of them to feed every parse worker
+    return SourceFetcher(max_workers=max(args.workers, args.parse_workers))
+
 
+def finish_run(fetcher: SourceFetcher) -> None:
+    fetcher.close()
+    PARSE_POOL.close()
+    CONNECTION_POOL.close()
+    VAULT.flush()
+    SOURCE_INDEX.flush()
+    SEARCH_INDEX.flush()
+    SIMILARITY_INDEX.flush()
+    CENTROIDS.flush()
+    SNAPSHOTS.flush()
+    if HTTP_CACHE.mode != "off":
+        HTTP_CACHE.prune()
+    TRACER.write(counters={f"cache_{key}": value for key, value in HTTP_CACHE.stats.items()})
+    PROFILER.report()
 
-def parse_args() -> argparse.Namespace:
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Ingest URLs into the cookbook knowledge vault.")
     parser.add_argument("url", nargs="?", help="Primary source URL.")
-    parser.add_argument("--kind", choices=["resource", "topic"], default="resource")
-    parser.add_argument("--topic-id", default="", help="Topic slug/path identifier for topic dossiers.")
-    parser.add_argument(
-        "--extra-source",
-        action="append",
-        default=[],
-        help="Additional corroborating source URL (repeatable).",
-    )
-    parser.add_argument("--min-citations", type=int, default=3)
-    parser.add_argument("--overwrite", action="store_true", help="Force overwrite when target note already exists.")
-    parser.add_argument("--group", choices=["auto", *GROUPS.keys()], default="auto")
-    parser.add_argument(
-        "--level",
-        choices=["auto", "beginner", "intermediate", "advanced"],
-        default="auto",
-    )
-    parser.add_argument("--title", default="", help="Optional manual title override.")
-    parser.add_argument("--dry-run", action="store_true")
-    return parser.parse_args()
+    add_ingest_options(parser)
+    add_run_options(parser)
+    return parser.parse_args(argv)
 
 
 def validate_args(args: argparse.Namespace) -> Tuple[str, str]:
@@ -744,21 +3629,68 @@ def validate_args(args: argparse.Namespace) -> Tuple[str, str]:
     return args.url, parsed.netloc.lower()
 
 
-def main() -> int:
-    args = parse_args()
-    try:
-        primary_url, _ = validate_args(args)
-    except ValueError as exc:
-        print(f"Error: {exc}")
-        return 1
-
-    extra_urls = list(dict.fromkeys(args.extra_source))
+def source_urls_for(args: argparse.Namespace) -> List[str]:
+    """Primary URL first, then corroborating sources de-duplicated by ``canonical_url``."""
+    primary_url = args.url
+    urls = {canonical_url(primary_url): primary_url}
+    extra_urls = list(args.extra_source)
     if args.kind == "resource" and primary_url in RESOURCE_EXTRA_SOURCES:
-        for url in RESOURCE_EXTRA_SOURCES[primary_url]:
-            if url != primary_url and url not in extra_urls:
-                extra_urls.append(url)
+        extra_urls.extend(RESOURCE_EXTRA_SOURCES[primary_url])
+    for url in extra_urls:
+        urls.setdefault(canonical_url(url), url)
+    return list(urls.values())
+
+
+def ingest(
+    args: argparse.Namespace,
+    fetcher: SourceFetcher,
+    on_stage: Optional[Callable[[str], None]] = None,
+    strict_fetch: bool = False,
+    on_duplicate: Optional[Callable[[Path, float], str]] = None,
+) -> IngestResult:
+    """Run fetch -> classify -> synthesize -> write for one validated request.
+
+    Raises ValueError when the citation minimum cannot be met outside dry-run mode, and
+    ``OfflineMissError`` when ``--offline`` or ``--cache-mode offline`` has nothing stored for the
+    primary source. With ``strict_fetch`` a retryable failure fetching the primary source is also
+    raised instead of producing an access-limited note. ``on_stage`` is called as each stage completes; index
+    entries are buffered in ``VAULT`` and reach disk when the run is finished. A new note whose
+    content matches an existing one is handled per ``args.duplicates``; ``on_duplicate`` answers
+    "ask" with merge, keep or skip (without it, "ask" keeps the new note).
+    """
+    primary_url = args.url
+    warnings: List[str] = []
+    stage_started = time.perf_counter()
 
-    primary_record = fetch_source_record(primary_url)
+    def report(stage: str) -> None:
+        # each stage's trace span runs from the previous stage's completion to this one
+        nonlocal stage_started
+        now = time.perf_counter()
+        TRACER.add(stage, "stage", stage_started, now, url=primary_url)
+        stage_started = now
+        if on_stage:
+            on_stage(stage)
+
+    # all sources for the note are fetched concurrently
+    urls = source_urls_for(args)
+    title_only = args.extra_fetch == "title"
+    if title_only:
+        fetcher.submit(urls[:1], urls[1:])
+    else:
+        fetcher.submit(urls)
+    source_records = fetcher.fetch_all(urls[:1]) + fetcher.fetch_all(urls[1:], title_only=title_only)
+    primary_record = source_records[0]
+    error = primary_record.fetch_error
+    if error is not None and (isinstance(error, OfflineMissError) or (strict_fetch and classify_error(error) != "permanent")):
+        raise error
+    report("fetched")
+
+    existing_entry = find_existing_entry_by_source(primary_url)
+    if existing_entry and existing_entry[6] != primary_url:
+        # the indexed source spelled differently (tracking parameters, www., an arXiv pdf link):
+        # keep the indexed URL so the note and its index line are not rewritten over the spelling
+        primary_url = existing_entry[6]
+        primary_record = source_records[0] = replace(primary_record, url=primary_url)
     combined_text = "\n".join(
         [
             primary_record.title,
@@ -769,10 +3701,9 @@ def main() -> int:
         ]
     )
 
-    existing_entry = find_existing_entry_by_source(primary_url)
-
-    inferred_group = classify_group(combined_text)
-    inferred_level = classify_level(combined_text)
+    inferred = classify_texts([combined_text])[0]
+    inferred_group = inferred["group"]
+    inferred_level = inferred["level"]
 
     if args.group != "auto":
         group = args.group
@@ -790,6 +3721,7 @@ def main() -> int:
 
     cfg = GROUPS[group]
 
+    fresh_dir = False
     if args.kind == "topic":
         topic_slug = slugify(args.topic_id)
         note_dir = ROOT / cfg.knowledge_dir / topic_slug
@@ -804,26 +3736,58 @@ def main() -> int:
             note_path = existing_entry[2]
             note_dir = note_path.parent
         else:
-            note_dir = unique_note_dir(ROOT / cfg.knowledge_dir, slugify(title))
+            note_dir = unique_note_dir(ROOT / cfg.knowledge_dir, slugify(title), primary_url)
             note_path = note_dir / "README.md"
+            fresh_dir = True
 
     if note_path.exists() and not args.overwrite and args.kind == "topic":
         # topic dossiers are stable paths; update in place by default
         pass
 
-    source_records = [primary_record]
-    for url in extra_urls:
-        source_records.append(fetch_source_record(url))
-
     try:
         bibliography = build_bibliography(source_records, args.min_citations)
     except ValueError as exc:
-        if args.dry_run:
-            print(f"warning={exc}")
-            bibliography = build_bibliography(source_records, min(len(source_records), 1))
-        else:
-            print(f"Error: {exc}")
-            return 2
+        if not args.dry_run:
+            raise
+        warnings.append(str(exc))
+        bibliography = build_bibliography(source_records, min(len(source_records), 1))
+
+    # the topic's slug rather than its raw id: the slug names the note's directory, so
+    # resynthesize can recover it
+    fingerprint = note_fingerprint(
+        source_records, group, level, title, args.kind, topic_slug, json.dumps(bibliography)
+    )
+    result = IngestResult(
+        url=primary_url,
+        action="Preview",
+        group=group,
+        level=level,
+        kind=args.kind,
+        note_path=note_path,
+        citations=len(bibliography),
+        warnings=warnings,
+    )
+    unchanged = (
+        not args.overwrite
+        and note_path.exists()
+        and read_frontmatter(note_path).get("fingerprint") == fingerprint
+    )
+    if unchanged and not args.dry_run:
+        # nothing upstream changed: leave the note (and its mtime) alone, only heal the index
+        report("synthesized")
+        report("written")
+        ensure_knowledge_index(group, cfg)
+        upsert_knowledge_index_entry(
+            cfg=cfg,
+            title=title,
+            note_dir=note_dir,
+            level=level,
+            source_url=primary_url,
+            citations_count=len(bibliography),
+        )
+        report("index_pending")
+        result.action = "Skipped"
+        return result
 
     note_content = build_note_content(
         cfg=cfg,
@@ -833,19 +3797,55 @@ def main() -> int:
         bibliography=bibliography,
         kind=args.kind,
         topic_id=args.topic_id,
+        corroborating=source_records[1:],
+        fingerprint=fingerprint,
     )
+    report("synthesized")
+
+    duplicate = None
+    if args.kind == "resource" and not note_path.exists() and not primary_record.access_limited:
+        duplicate = SIMILARITY_INDEX.find(note_content)
+    if duplicate is not None:
+        duplicate_path, similarity = duplicate
+        warnings.append(f"probably a duplicate of {duplicate_path.relative_to(ROOT)} ({similarity:.0%} similar)")
+        choice = args.duplicates
+        if choice == "ask":
+            choice = on_duplicate(duplicate_path, similarity) if on_duplicate and not args.dry_run else "keep"
+        if choice == "skip" and not args.dry_run:
+            result.action, result.note_path = "Duplicate", duplicate_path
+            return result
+        if choice == "merge" and not args.dry_run:
+            # index this source under the existing note instead of writing a second copy
+            group, title, level = duplicate_entry(duplicate_path)
+            cfg = GROUPS[group]
+            report("written")
+            ensure_knowledge_index(group, cfg)
+            upsert_knowledge_index_entry(
+                cfg=cfg,
+                title=title,
+                note_dir=duplicate_path.parent,
+                level=level,
+                source_url=primary_url,
+                citations_count=len(bibliography),
+            )
+            report("index_pending")
+            result.action, result.note_path, result.group, result.level = "Merged", duplicate_path, group, level
+            return result
 
     if args.dry_run:
-        print(f"group={group}")
-        print(f"level={level}")
-        print(f"kind={args.kind}")
-        print(f"target={note_path.relative_to(ROOT)}")
-        print(f"citations={len(bibliography)}")
-        return 0
+        return result
 
-    existed_before = note_path.exists()
-    note_dir.mkdir(parents=True, exist_ok=True)
-    note_path.write_text(note_content, encoding="utf-8")
+    # under the vault lock no other ingestor or resynthesize run writes between picking the
+    # directory and writing the note; a new note's directory is picked again in case another
+    # ingestor took it since
+    with VAULT.lock():
+        if fresh_dir:
+            note_dir = unique_note_dir(ROOT / cfg.knowledge_dir, slugify(title), primary_url)
+            note_path = result.note_path = note_dir / "README.md"
+        existed_before = note_path.exists()
+        note_dir.mkdir(parents=True, exist_ok=True)
+        VAULT.write_note(note_path, note_content)
+    report("written")
 
     ensure_knowledge_index(group, cfg)
     upsert_knowledge_index_entry(
@@ -856,11 +3856,1041 @@ def main() -> int:
         source_url=primary_url,
         citations_count=len(bibliography),
     )
+    report("index_pending")
+
+    result.action = "Updated" if existed_before else "Created"
+    return result
+
+
+def duplicate_entry(note_path: Path) -> Tuple[str, str, str]:
+    """Group, title and level to index another source under an existing note."""
+    entry = SOURCE_INDEX.lookup_note(note_path)
+    if entry is not None:
+        return entry
+    rel_path = note_path.relative_to(ROOT)
+    group = next(name for name, cfg in GROUPS.items() if rel_path.is_relative_to(cfg.knowledge_dir))
+    tags = note_tags(read_frontmatter(note_path))
+    level = next((tag for tag in tags if tag in LEVEL_KEYWORDS), DEFAULT_CLASSIFICATION["level"])
+    return group, title_from_slug(note_path.parent.name), level
+
+
+def ask_duplicate(note_path: Path, similarity: float) -> str:
+    prompt = (
+        f"This looks like {note_path.relative_to(ROOT)} ({similarity:.0%} similar). "
+        "[m]erge into it, [k]eep a new note or [s]kip? "
+    )
+    while True:
+        try:
+            answer = input(prompt).strip().lower()[:1]
+        except EOFError:
+            return "keep"
+        choice = {"m": "merge", "k": "keep", "s": "skip"}.get(answer)
+        if choice:
+            return choice
+
+
+class ItemParser(argparse.ArgumentParser):
+    """Parser for the options on one batch line; errors are raised instead of exiting."""
+
+    def error(self, message: str) -> NoReturn:
+        raise ValueError(message)
+
+
+def manifest_overrides(data: Dict[str, Any], actions: Dict[str, argparse.Action]) -> Dict[str, object]:
+    """Option values of one JSONL item, checked and coerced the way argparse treats the flags.
+
+    Raises ValueError for keys that are not item options and for values of the wrong type or
+    outside an option's choices; a null value leaves the batch-level default in place.
+    """
+    overrides: Dict[str, object] = {}
+    for key, value in data.items():
+        dest = key.replace("-", "_")
+        if dest == "extra_sources":
+            dest = "extra_source"
+        action = actions.get(dest)
+        if action is None:
+            raise ValueError(f"unknown option {key!r}")
+        if value is None:
+            continue
+        if dest == "extra_source":
+            values = [value] if isinstance(value, str) else value
+            if not isinstance(values, list) or not all(isinstance(url, str) for url in values):
+                raise ValueError(f"{key} must be a URL or a list of URLs")
+            overrides[dest] = [*overrides.get(dest, []), *values]  # type: ignore[misc]
+            continue
+        if action.nargs == 0:
+            # store_true flags
+            if not isinstance(value, bool):
+                raise ValueError(f"{key} must be true or false")
+        elif isinstance(value, (str, int, float)) and not isinstance(value, bool):
+            convert = action.type or str
+            try:
+                value = convert(str(value))  # type: ignore[operator]
+            except ValueError:
+                raise ValueError(f"{key}: invalid {getattr(convert, '__name__', 'value')} value {value!r}") from None
+            if action.choices is not None and value not in action.choices:
+                raise ValueError(f"{key} must be one of: {', '.join(map(str, action.choices))}")
+        else:
+            raise ValueError(f"{key} must be a string or a number")
+        overrides[dest] = value
+    return overrides
+
+
+def parse_batch_items(lines: Iterable[str], defaults: argparse.Namespace) -> List[argparse.Namespace]:
+    """Turn batch input into per-item namespaces layered over the batch-level defaults.
+
+    Each non-blank, non-comment line is either a JSON object (JSONL manifest) whose keys
+    mirror the CLI option names, or a plain ``URL [--option value ...]`` line. An item whose
+    options are unknown or invalid keeps the reason in ``invalid`` and fails on its own; only
+    lines that cannot be read at all raise ValueError.
+    """
+    item_parser = ItemParser(prog="batch item", add_help=False)
+    item_parser.add_argument("url")
+    add_ingest_options(item_parser)
+    for action in item_parser._actions:
+        # only options spelled out on the line may override the batch-level defaults
+        action.default = argparse.SUPPRESS
+    actions = {action.dest: action for action in item_parser._actions}
+
+    items: List[argparse.Namespace] = []
+    for lineno, raw in enumerate(lines, start=1):
+        line = raw.strip()
+        if not line or line.startswith("#"):
+            continue
+        overrides: Dict[str, object]
+        invalid = None
+        if line.startswith("{"):
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise ValueError(f"line {lineno}: invalid JSON ({exc.msg})") from exc
+            if not isinstance(data, dict):
+                raise ValueError(f"line {lineno}: expected a JSON object")
+            try:
+                overrides = manifest_overrides(data, actions)
+            except ValueError as exc:
+                url = data.get("url")
+                overrides, invalid = {"url": url if isinstance(url, str) else None}, f"line {lineno}: {exc}"
+        else:
+            words = shlex.split(line)
+            try:
+                overrides = vars(item_parser.parse_args(words))
+            except ValueError as exc:
+                overrides, invalid = {"url": words[0]}, f"line {lineno}: {exc}"
+
+        item = argparse.Namespace(**vars(defaults))
+        item.url = None
+        for key, value in overrides.items():
+            if key == "extra_source":
+                value = [*defaults.extra_source, *value]  # type: ignore[misc]
+            setattr(item, key, value)
+        item.line = lineno
+        item.invalid = invalid
+        items.append(item)
+    return items
+
+
+TRANSIENT_HTTP_CODES = {408: "server", 425: "rate_limited", 429: "rate_limited", 500: "server", 502: "server", 503: "rate_limited", 504: "server"}
+# Backoff multipliers per error class; rate limiting backs off hardest.
+BACKOFF_FACTORS = {"network": 1.0, "server": 2.0, "rate_limited": 4.0}
+
+
+def classify_error(exc: BaseException) -> str:
+    """Map a failure to a retry class: ``network``, ``server``, ``rate_limited`` or ``permanent``."""
+    if isinstance(exc, urllib.error.HTTPError):
+        return TRANSIENT_HTTP_CODES.get(exc.code, "permanent")
+    if isinstance(exc, urllib.error.URLError):
+        if isinstance(exc, OfflineMissError) or isinstance(exc.reason, ssl.SSLError):
+            return "permanent"
+        return "network"
+    if isinstance(exc, (TimeoutError, ConnectionError, http.client.HTTPException)):
+        return "network"
+    return "permanent"
+
+
+class JobJournal:
+    """Append-only JSONL journal of batch item stages, used to resume interrupted runs.
+
+    Every stage transition (fetched, synthesized, written, index_pending, failed) is appended and
+    fsynced before the batch moves on, so the last line per item is its durable state. Items
+    become ``indexed`` once the buffered index entries are flushed at the end of the run. An
+    item left at ``written`` or ``index_pending`` by a crash is redone on resume: the index has
+    no entry for it yet, so ``unique_note_dir`` finds the note by its ``source_url``, the note
+    is skipped as unchanged and its index entry is written.
+    """
+
+    DONE = "indexed"
+    # the per-item options that decide what gets written; run-level flags do not change identity
+    ITEM_FIELDS = ("url", "kind", "topic_id", "extra_source", "group", "level", "title", "extra_fetch", "min_citations")
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._handle = self.path.open("a", encoding="utf-8")
+
+    @staticmethod
+    def default_path(manifest: str) -> Path:
+        source = "stdin" if manifest == "-" else str(Path(manifest).resolve())
+        return CACHE_DIR / "jobs" / f"{hashlib.sha256(source.encode('utf-8')).hexdigest()[:12]}.jsonl"
+
+    @staticmethod
+    def item_key(item: argparse.Namespace) -> str:
+        options = {key: getattr(item, key, None) for key in JobJournal.ITEM_FIELDS}
+        return hashlib.sha256(json.dumps(options, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+    def states(self) -> Dict[str, Dict[str, object]]:
+        states: Dict[str, Dict[str, object]] = {}
+        try:
+            lines = self.path.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            return states
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # a torn final line from a crash
+            states[record["key"]] = record
+        return states
+
+    def record(self, key: str, url: str, stage: str, **extra: object) -> None:
+        entry = {"ts": time.time(), "key": key, "url": url, "stage": stage, **extra}
+        self._handle.write(json.dumps(entry) + "\n")
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+
+    def close(self) -> None:
+        self._handle.close()
+
+
+def ingest_item(
+    item: argparse.Namespace,
+    fetcher: SourceFetcher,
+    prefix: str,
+    retries: int,
+    backoff: float,
+    journal: Optional[JobJournal] = None,
+    index_pending: Optional[List[Tuple[str, str]]] = None,
+    invalid: Optional[str] = None,
+) -> Tuple[Optional[IngestResult], Optional[BaseException]]:
+    """Ingest one queued item with classified retries, printing its progress lines.
+
+    Stage transitions go to ``journal``; items whose index entry was buffered are appended to
+    ``index_pending`` so the caller can mark them indexed once the vault is flushed. Returns
+    the result, or None and the final error.
+    """
+    key = JobJournal.item_key(item)
+    url = getattr(item, "url", "") or ""
+
+    def on_stage(stage: str) -> None:
+        if journal:
+            journal.record(key, url, stage)
+        if stage == "index_pending" and index_pending is not None:
+            index_pending.append((key, url))
+
+    attempt = 0
+    while True:
+        try:
+            if invalid is not None:
+                raise ValueError(invalid)
+            # transient fetch failures fail the item (retryable later) instead of
+            # writing an access-limited note
+            with TRACER.span("ingest", url=url, attempt=attempt + 1):
+                result = ingest(item, fetcher, on_stage=on_stage, strict_fetch=True)
+            break
+        except Exception as exc:  # one bad item must not abort the whole run
+            error_class = classify_error(exc)
+            if error_class != "permanent" and attempt < retries:
+                delay = backoff * BACKOFF_FACTORS[error_class] * 2**attempt
+                delay *= random.uniform(0.8, 1.2)
+                attempt += 1
+                print(f"{prefix} Retry {attempt}/{retries} in {delay:.1f}s ({error_class}): {exc}")
+                if journal:
+                    journal.record(key, url, "retrying", error=str(exc), error_class=error_class, attempt=attempt)
+                time.sleep(delay)
+                fetcher.forget(source_urls_for(item))
+                continue
+            if journal:
+                journal.record(key, url, "failed", error=str(exc), error_class=error_class, attempts=attempt + 1)
+            print(f"{prefix} Failed: {url or f'line {item.line}'} | {exc}")
+            return None, exc
+
+    for warning in result.warnings:
+        print(f"{prefix} warning={warning}")
+    print(
+        f"{prefix} {result.action}: {result.note_path.relative_to(ROOT)} | "
+        f"Group: {result.group} | Level: {result.level} | Citations: {result.citations}"
+    )
+    return result, None
+
+
+def run_batch(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="add_knowledge_from_url.py batch",
+        description="Ingest many URLs in one process from a URL list or JSONL manifest.",
+    )
+    parser.add_argument("manifest", help="URL list or JSONL manifest path, or '-' for stdin.")
+    add_ingest_options(parser)
+    add_run_options(parser)
+    parser.add_argument("--fail-fast", action="store_true", help="Stop at the first failed item.")
+    parser.add_argument("--journal", type=Path, default=None, help="Job journal path (default: .cache/jobs/<manifest>.jsonl).")
+    resume = parser.add_mutually_exclusive_group()
+    resume.add_argument("--resume", action="store_true", help="Skip items the journal records as fully indexed.")
+    resume.add_argument("--retry-failed", action="store_true", help="Only run items whose last journal state is failed.")
+    parser.add_argument("--retries", type=int, default=2, help="Retries for transient failures (default: 2).")
+    parser.add_argument("--backoff", type=float, default=2.0, help="Base seconds for exponential retry backoff.")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.manifest == "-":
+            lines = sys.stdin.read().splitlines()
+        else:
+            lines = Path(args.manifest).read_text(encoding="utf-8").splitlines()
+        items = parse_batch_items(lines, args)
+    except (OSError, ValueError) as exc:
+        print(f"Error: {exc}")
+        return 1
+
+    journal = None if args.dry_run else JobJournal(args.journal or JobJournal.default_path(args.manifest))
+    counts: Dict[str, int] = {}
+    total = len(items)
+    if journal and (args.resume or args.retry_failed):
+        states = journal.states()
+        selected = []
+        for position, item in enumerate(items, start=1):
+            stage = states.get(JobJournal.item_key(item), {}).get("stage")
+            if args.resume and stage == JobJournal.DONE:
+                label = "Already done"
+            elif args.retry_failed and stage != "failed":
+                label = "Not retried"
+            else:
+                selected.append((position, item))
+                continue
+            counts[label] = counts.get(label, 0) + 1
+    else:
+        selected = list(enumerate(items, start=1))
+
+    started = time.monotonic()
+    fetcher = configure_run(args)
+    invalid: Dict[int, str] = {}
+    queued: List[str] = []
+    title_queued: List[str] = []
+    for position, item in selected:
+        error = validate_error(item)
+        if error is not None:
+            invalid[position] = error
+            continue
+        urls = source_urls_for(item)
+        queued.append(urls[0])
+        (title_queued if item.extra_fetch == "title" else queued).extend(urls[1:])
+    # queue every source up front so the pool works ahead of note synthesis
+    fetcher.submit(queued, title_queued)
+    # a record is kept whole only while a later item still needs it as its primary source
+    primary_uses = Counter(source_urls_for(item)[0] for position, item in selected if position not in invalid)
+
+    index_pending: List[Tuple[str, str]] = []
+    try:
+        for position, item in selected:
+            result, _ = ingest_item(
+                item,
+                fetcher,
+                prefix=f"[{position}/{total}]",
+                retries=args.retries,
+                backoff=args.backoff,
+                journal=journal,
+                index_pending=index_pending,
+                invalid=invalid.get(position),
+            )
+            action = result.action if result else "Failed"
+            counts[action] = counts.get(action, 0) + 1
+            if result is None and args.fail_fast:
+                break
+            if position not in invalid:
+                urls = source_urls_for(item)
+                primary_uses[urls[0]] -= 1
+                fetcher.drop_blocks(url for url in urls if primary_uses[url] <= 0)
+    finally:
+        finish_run(fetcher)
+        if journal:
+            for key, url in index_pending:
+                journal.record(key, url, JobJournal.DONE)
+            journal.close()
+
+    summary = ", ".join(f"{action}: {count}" for action, count in sorted(counts.items()))
+    elapsed = time.monotonic() - started
+    print(f"Batch complete ({total} items in {elapsed:.1f}s) - {summary or 'nothing to do'}")
+    if HTTP_CACHE.mode != "off":
+        print("Cache: " + ", ".join(f"{key}: {value}" for key, value in HTTP_CACHE.stats.items()))
+    if journal:
+        print(f"Journal: {journal.path.relative_to(ROOT) if journal.path.is_relative_to(ROOT) else journal.path}")
+    return 1 if counts.get("Failed") else 0
+
+
+INBOX_PATH = Path("00_Inbox/Capture.md")
+INBOX_LINE_RE = re.compile(r"^(?P<indent>\s*)(?:[-*+]\s+)?(?:\[(?P<mark>[ xX-])\]\s+)?(?P<text>.*?)\s*$")
+INBOX_URL_RE = re.compile(r"https?://[^\s<>()\[\]]+")
+
+
+class FileWatcher:
+    """Polls files for (mtime, size) changes and reports each once it has been quiet for ``debounce`` seconds.
+
+    Every path is reported on the first poll that follows its debounce window, so work already
+    waiting in the files at startup is picked up.
+    """
+
+    def __init__(self, paths: Iterable[Path], debounce: float = 0.5) -> None:
+        self.debounce = debounce
+        self._seen: Dict[Path, Optional[Tuple[int, int]]] = {path: (-1, -1) for path in paths}
+        self._settling: Dict[Path, Tuple[Optional[Tuple[int, int]], float]] = {}
+
+    @staticmethod
+    def _stamp(path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def poll(self, debounce: Optional[float] = None) -> List[Path]:
+        quiet = self.debounce if debounce is None else debounce
+        now = time.monotonic()
+        ready: List[Path] = []
+        for path, seen in self._seen.items():
+            stamp = self._stamp(path)
+            if stamp == seen:
+                self._settling.pop(path, None)
+                continue
+            settling = self._settling.get(path)
+            if settling is None or settling[0] != stamp:
+                # changed (again): restart the quiet period
+                self._settling[path] = (stamp, now)
+                if quiet > 0:
+                    continue
+                settling = self._settling[path]
+            if now - settling[1] >= quiet:
+                ready.append(path)
+                self._seen[path] = stamp
+                del self._settling[path]
+        return ready
+
+
+def inbox_requests(text: str) -> List[Tuple[int, str]]:
+    """Unprocessed inbox lines as (line index, ``URL [--option ...]``) pairs.
+
+    A line counts when it holds a URL and is not checked off (``[x]``) or dropped (``[-]``).
+    Options are only taken from text that follows the URL and starts with ``--``; anything
+    else on the line is treated as a human note.
+    """
+    lines = text.splitlines()
+    match = FRONTMATTER_RE.match(text)
+    start = match.group(0).count("\n") if match else 0
+    requests: List[Tuple[int, str]] = []
+    fenced = False
+    for position in range(start, len(lines)):
+        line = lines[position]
+        if line.lstrip().startswith("```"):
+            fenced = not fenced
+            continue
+        if fenced:
+            continue
+        parsed = INBOX_LINE_RE.match(line)
+        url_match = INBOX_URL_RE.search(line)
+        if not parsed or not url_match or (parsed.group("mark") or " ") in "xX-":
+            continue
+        request = url_match.group(0).rstrip(".,;:")
+        rest = line[url_match.end() :].strip()
+        if rest.startswith("--"):
+            request = f"{request} {rest}"
+        requests.append((position, request))
+    return requests
+
+
+def mark_inbox(path: Path, marks: Dict[str, str]) -> None:
+    """Check off processed inbox lines, keyed by their original text.
+
+    The file is re-read under the vault lock right before the atomic rewrite, so lines added
+    while the batch was running are kept.
+    """
+    if not marks:
+        return
+    with VAULT.lock():
+        lines = path.read_text(encoding="utf-8").splitlines()
+        pending = dict(marks)
+        for position, line in enumerate(lines):
+            if line in pending:
+                lines[position] = pending.pop(line)
+        VAULT.write_note(path, "\n".join(lines) + "\n")
+
+
+def inbox_mark(line: str, result: Optional[IngestResult], error: Optional[BaseException]) -> str:
+    parsed = INBOX_LINE_RE.match(line)
+    indent, text = (parsed.group("indent"), parsed.group("text")) if parsed else ("", line.strip())
+    if result is not None:
+        link = result.note_path.relative_to(ROOT).with_suffix("").as_posix()
+        return f"{indent}- [x] {text} -> [[{link}]]"
+    reason = " ".join(str(error).split())[:160]
+    return f"{indent}- [-] {text} (failed: {reason})"
+
+
+def process_items(
+    items: List[argparse.Namespace], fetcher: SourceFetcher, args: argparse.Namespace, journal: Optional[JobJournal] = None
+) -> List[Tuple[Optional[IngestResult], Optional[BaseException]]]:
+    """Ingest watched items, then flush the vault so their index entries land before marking."""
+    index_pending: List[Tuple[str, str]] = []
+    outcomes = []
+    prefix = f"[{time.strftime('%H:%M:%S')}]"
+    errors = [validate_error(item) for item in items]
+    fetcher.submit(url for item, error in zip(items, errors) if error is None for url in source_urls_for(item))
+    for item, error in zip(items, errors):
+        outcomes.append(
+            ingest_item(
+                item,
+                fetcher,
+                prefix=prefix,
+                retries=args.retries,
+                backoff=args.backoff,
+                journal=journal,
+                index_pending=index_pending,
+                invalid=error,
+            )
+        )
+        if error is None:
+            # the next time this link shows up it should be fetched (or revalidated) again
+            fetcher.forget(source_urls_for(item))
+    VAULT.flush()
+    SOURCE_INDEX.flush()
+    SEARCH_INDEX.flush()
+    SIMILARITY_INDEX.flush()
+    CENTROIDS.flush()
+    SNAPSHOTS.flush()
+    if journal:
+        for key, url in index_pending:
+            journal.record(key, url, JobJournal.DONE)
+    sys.stdout.flush()
+    return outcomes
+
+
+def validate_error(item: argparse.Namespace) -> Optional[str]:
+    """Why a queued item cannot be ingested, or None; never raises."""
+    if getattr(item, "invalid", None):
+        return str(item.invalid)
+    try:
+        validate_args(item)
+    except Exception as exc:  # a malformed item fails on its own instead of aborting the run
+        return str(exc) or type(exc).__name__
+    return None
+
+
+def watch_inbox(path: Path, fetcher: SourceFetcher, args: argparse.Namespace) -> int:
+    text = path.read_text(encoding="utf-8")
+    lines = text.splitlines()
+    items: List[argparse.Namespace] = []
+    originals: List[str] = []
+    marks: Dict[str, str] = {}
+    failed = 0
+    for position, request in inbox_requests(text):
+        try:
+            item = parse_batch_items([request], args)[0]
+        except ValueError as exc:
+            print(f"Failed: {request} | {exc}", flush=True)
+            marks[lines[position]] = inbox_mark(lines[position], None, exc)
+            failed += 1
+            continue
+        item.line = position + 1
+        items.append(item)
+        originals.append(lines[position])
+    outcomes = process_items(items, fetcher, args) if items else []
+    for line, (result, error) in zip(originals, outcomes):
+        marks[line] = inbox_mark(line, result, error)
+        failed += result is None
+    if not args.dry_run:
+        mark_inbox(path, marks)
+    return failed
+
+
+def watch_queue(path: Path, journal: JobJournal, fetcher: SourceFetcher, args: argparse.Namespace) -> int:
+    states = journal.states()
+    items: List[argparse.Namespace] = []
+    for lineno, line in enumerate(path.read_text(encoding="utf-8").splitlines(), start=1):
+        try:
+            parsed = parse_batch_items([line], args)
+        except ValueError as exc:
+            print(f"Error: {path}: line {lineno}: {exc}", flush=True)
+            continue
+        for item in parsed:
+            item.line = lineno
+            if states.get(JobJournal.item_key(item), {}).get("stage") not in {JobJournal.DONE, "failed"}:
+                items.append(item)
+    outcomes = process_items(items, fetcher, args, journal=journal) if items else []
+    return sum(1 for result, _ in outcomes if result is None)
+
+
+def run_watch(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="add_knowledge_from_url.py watch",
+        description="Keep ingesting links as they are added to the inbox or a queue file.",
+    )
+    add_ingest_options(parser)
+    add_run_options(parser)
+    parser.add_argument("--inbox", type=Path, default=ROOT / INBOX_PATH, help="Inbox note to watch (default: 00_Inbox/Capture.md).")
+    parser.add_argument(
+        "--queue",
+        type=Path,
+        action="append",
+        default=[],
+        help="URL list or JSONL manifest to watch (repeatable); progress is kept in its job journal.",
+    )
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between polls (default: 1).")
+    parser.add_argument("--debounce", type=float, default=0.5, help="Quiet seconds after a change before ingesting (default: 0.5).")
+    parser.add_argument("--once", action="store_true", help="Process what is waiting now and exit.")
+    parser.add_argument("--retries", type=int, default=2, help="Retries for transient failures (default: 2).")
+    parser.add_argument("--backoff", type=float, default=2.0, help="Base seconds for exponential retry backoff.")
+    args = parser.parse_args(argv)
+
+    paths = [args.inbox, *args.queue]
+    watcher = FileWatcher(paths, debounce=args.debounce)
+    journals = {queue: JobJournal(JobJournal.default_path(str(queue))) for queue in args.queue}
+    # the fetcher, connection pool, caches and source index stay warm between polls
+    fetcher = configure_run(args)
+    print(f"Watching {', '.join(str(path) for path in paths)} (Ctrl-C to stop)", flush=True)
+
+    def stop(signum: int, frame: object) -> None:
+        raise KeyboardInterrupt
+
+    # a service manager's SIGTERM shuts down as cleanly as Ctrl-C
+    signal.signal(signal.SIGTERM, stop)
+    failed = 0
+    try:
+        while True:
+            # batch runs, rebuilds and hand edits by other processes change the indexes under us
+            SOURCE_INDEX.refresh()
+            for path in watcher.poll(debounce=0 if args.once else None):
+                try:
+                    if path in journals:
+                        failed += watch_queue(path, journals[path], fetcher, args)
+                    else:
+                        failed += watch_inbox(path, fetcher, args)
+                except (OSError, ValueError) as exc:
+                    print(f"Error: {path}: {exc}", flush=True)
+            if args.once:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        finish_run(fetcher)
+        for journal in journals.values():
+            journal.close()
+    return 1 if failed else 0
+
+
+def run_search(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="add_knowledge_from_url.py search",
+        description="Full-text search over the vault's notes, ranked with BM25.",
+    )
+    parser.add_argument("query", nargs="+", help="Search terms.")
+    domains = sorted({cfg.domain for cfg in GROUPS.values()})
+    parser.add_argument("--domain", choices=[*domains, *(group for group in GROUPS if group not in domains)], default=None)
+    parser.add_argument("--level", choices=list(LEVEL_KEYWORDS), default=None)
+    parser.add_argument("--limit", type=int, default=10, help="Results to show (default: 10).")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild the index from scratch first.")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON lines.")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    if args.rebuild:
+        SEARCH_INDEX.build()
+    else:
+        SEARCH_INDEX.refresh()
+        SEARCH_INDEX.flush()
+    domain = GROUPS[args.domain].domain if args.domain in GROUPS else args.domain
+    results, matches = SEARCH_INDEX.search(" ".join(args.query), domain=domain, level=args.level, limit=args.limit)
+    elapsed = (time.perf_counter() - started) * 1000
+
+    for score, meta in results:
+        path, title, note_domain, level = meta[:4]
+        if args.json:
+            print(json.dumps({"score": round(score, 4), "path": path, "title": title, "domain": note_domain, "level": level}))
+        else:
+            print(f"{score:7.2f}  {path} | {title} | {note_domain or '-'} | {level or '-'}")
+    if not args.json:
+        print(f"{len(results)} of {matches} matching notes in {elapsed:.1f} ms")
+    return 0 if results else 1
+
+
+MOC_DOSSIERS_HEADING = "## Knowledge Dossiers"
+FRONTMATTER_UPDATED_RE = re.compile(r"^updated: .*$", re.M)
+
+
+@dataclass
+class NoteEntry:
+    group: str
+    path: str
+    title: str
+    level: str
+    kind: str
+    source_url: str
+    citations: int
+
+
+def read_note_entry(group: str, path: Path) -> Optional[NoteEntry]:
+    """Index fields of one knowledge note: frontmatter, first heading and bibliography size."""
+    try:
+        text = path.read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError):
+        return None
+    fields = parse_frontmatter(text)
+    match = FRONTMATTER_RE.match(text)
+    title = ""
+    section = ""
+    citations = 0
+    for line in (text[match.end() :] if match else text).splitlines():
+        if line.startswith("# ") and not title:
+            title = line[2:].strip()
+        elif line.startswith("## "):
+            section = line[3:].strip()
+        elif section == "Bibliography" and line.startswith("- ["):
+            citations += 1
+    return NoteEntry(
+        group=group,
+        path=path.relative_to(ROOT).as_posix(),
+        title=title or title_from_slug(path.parent.name),
+        level=next((tag for tag in note_tags(fields) if tag in LEVEL_KEYWORDS), DEFAULT_CLASSIFICATION["level"]),
+        kind=fields.get("kind", "resource"),
+        source_url=fields.get("source_url", ""),
+        citations=citations,
+    )
+
+
+def scan_knowledge_notes(workers: int, chunk_size: int = 256) -> Dict[str, List[NoteEntry]]:
+    """Every group's knowledge notes, read on a thread pool and sorted by level, title and path."""
+    levels = list(LEVEL_KEYWORDS)
+
+    def read_chunk(chunk: List[Tuple[str, Path]]) -> List[Optional[NoteEntry]]:
+        return [read_note_entry(group, path) for group, path in chunk]
+
+    by_group: Dict[str, List[NoteEntry]] = {group: [] for group in GROUPS}
+    with ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="rebuild") as pool:
+        listings = pool.map(lambda cfg: sorted((ROOT / cfg.knowledge_dir).glob("*/README.md")), GROUPS.values())
+        jobs = [(group, path) for group, paths in zip(GROUPS, listings) for path in paths]
+        chunks = [jobs[start : start + chunk_size] for start in range(0, len(jobs), chunk_size)]
+        for notes in pool.map(read_chunk, chunks):
+            for note in notes:
+                if note is not None:
+                    by_group[note.group].append(note)
+    for entries in by_group.values():
+        entries.sort(key=lambda note: (levels.index(note.level), note.title.casefold(), note.path))
+    return by_group
+
+
+def replace_section(text: str, heading: str, lines: List[str]) -> str:
+    """Swap the body of ``heading`` (up to the next ``## `` heading) for ``lines``.
+
+    A missing section is appended; with no ``lines`` the section is dropped.
+    """
+    current = text.split("\n")
+    try:
+        start = current.index(heading)
+    except ValueError:
+        if not lines:
+            return text
+        return text.rstrip("\n") + "\n\n" + "\n".join([heading, *lines]) + "\n"
+    end = next((i for i in range(start + 1, len(current)) if current[i].startswith("## ")), len(current))
+    tail = current[end:]
+    if not lines:
+        head = "\n".join(current[:start]).rstrip("\n")
+        return "\n".join([head, "", *tail]) if tail else head + "\n"
+    section = [heading, *lines]
+    if tail:
+        section.append("")
+    return "\n".join([*current[:start], *section, *tail]) + ("" if tail else "\n")
+
+
+def render_knowledge_index(group: str, cfg: GroupConfig, notes: List[NoteEntry], text: Optional[str]) -> Tuple[str, List[str]]:
+    """Regenerated index text plus warnings.
+
+    Checked marks survive, as do the lines of notes without a source and the extra lines that
+    ``--duplicates merge`` adds to index another source under a note; lines pointing at notes
+    that no longer exist are dropped.
+    """
+    # plain string paths: pathlib resolution dominated the run at 10k entries
+    index_dir = cfg.knowledge_index.parent.as_posix()
+    # note path -> [(checked, line, source)] in index order
+    kept: Dict[str, List[Tuple[bool, str, str]]] = {}
+    for line in (text or "").splitlines():
+        stripped = line.strip()
+        checked = stripped[:6].lower() == "- [x] "
+        match = ENTRY_RE.match("- [ ] " + stripped[6:] if checked else stripped)
+        if match:
+            path = posixpath.normpath(posixpath.join(index_dir, match.group("path")))
+            kept.setdefault(path, []).append((checked, stripped, match.group("source")))
+
+    warnings: List[str] = []
+    lines = [""]
+    for note in notes:
+        previous = kept.get(note.path, [])
+        if not note.source_url:
+            if not previous:
+                warnings.append(f"{note.path} has no source_url; left out of {cfg.knowledge_index.as_posix()}")
+            lines.extend(line for _, line, _ in previous)
+            continue
+        own = [entry for entry in previous if entry[2] == note.source_url]
+        if len(own) < len(previous):
+            source = canonical_url(note.source_url)
+            own += [entry for entry in previous if entry not in own and canonical_url(entry[2]) == source]
+        checked = (own or previous or [(False, "", "")])[0][0]
+        rel_note = Path(posixpath.relpath(note.path, index_dir))
+        line = index_entry_line(note.title, rel_note, note.level, note.source_url, note.citations)
+        lines.append("- [x] " + line[6:] if checked else line)
+        # other sources merged into this note
+        lines.extend(entry[1] for entry in previous if entry not in own)
+    return replace_section(text or knowledge_index_template(group, cfg), "## Entries", lines), warnings
+
+
+def render_moc(text: str, notes: List[NoteEntry]) -> str:
+    """The MOC with its dossier section listing every topic dossier of the groups it maps."""
+    links = [
+        f"- [[{Path(note.path).with_suffix('').as_posix()}|{note.title}]]" for note in notes if note.kind == "topic"
+    ]
+    return replace_section(text, MOC_DOSSIERS_HEADING, links)
+
+
+def touch_updated(text: str) -> str:
+    return FRONTMATTER_UPDATED_RE.sub(f"updated: {TODAY}", text, count=1)
+
+
+def run_rebuild(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="add_knowledge_from_url.py rebuild",
+        description="Regenerate every Knowledge Index and the MOC dossier sections from the notes on disk.",
+    )
+    parser.add_argument("--workers", type=int, default=8, help="Threads reading notes (default: 8).")
+    parser.add_argument("--dry-run", action="store_true", help="Only list the files that would change.")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    warnings: List[str] = []
+    rendered: Dict[Path, Tuple[Optional[str], str]] = {}
+    # the lock keeps ingestors from flushing entries between the scan and the rewrite
+    with VAULT.lock():
+        notes = scan_knowledge_notes(args.workers)
+        for group, cfg in GROUPS.items():
+            index_path = ROOT / cfg.knowledge_index
+            text = index_path.read_text(encoding="utf-8") if index_path.exists() else None
+            if text is None and not notes[group]:
+                continue
+            updated, index_warnings = render_knowledge_index(group, cfg, notes[group], text)
+            rendered[index_path] = (text, updated)
+            warnings.extend(index_warnings)
+        mocs: Dict[Path, List[NoteEntry]] = {}
+        for group, cfg in GROUPS.items():
+            mocs.setdefault(ROOT / cfg.moc, []).extend(notes[group])
+        for moc_path, moc_notes in mocs.items():
+            if moc_path.exists():
+                text = moc_path.read_text(encoding="utf-8")
+                rendered[moc_path] = (text, render_moc(text, moc_notes))
+
+        changed = [path for path, (before, after) in rendered.items() if before != after]
+        for path in changed:
+            before, after = rendered[path]
+            print(f"{'Would rewrite' if args.dry_run else 'Rewrote'}: {path.relative_to(ROOT)}")
+            if not args.dry_run:
+                write_bytes_atomic(path, touch_updated(after).encode("utf-8"))
+    if changed and not args.dry_run:
+        SOURCE_INDEX.rebuild()
+        SOURCE_INDEX.flush()
+    if not args.dry_run:
+        CENTROIDS.refresh()
+        CENTROIDS.flush()
+
+    for warning in warnings:
+        print(f"warning={warning}")
+    total = sum(len(entries) for entries in notes.values())
+    elapsed = time.perf_counter() - started
+    print(f"Rebuilt from {total} notes in {elapsed:.2f}s - {len(changed)} changed, {len(rendered) - len(changed)} unchanged")
+    return 0
+
+
+BIBLIOGRAPHY_LINE_RE = re.compile(r"^- \[(?P<title>.*)\]\((?P<url>\S+)\)$")
+CAPTURED_RE = re.compile(r"^Captured on (?P<date>\S+)\.$", re.M)
+FRONTMATTER_CREATED_RE = re.compile(r"^created: .*$", re.M)
+
+
+def resynthesize_note(group: str, rel_path: str) -> Optional[str]:
+    """A note rebuilt from the snapshot pack, or None when its primary source has no snapshot.
+
+    Group, level, title and kind come from the note, sources from its bibliography; sources
+    without a snapshot are cited by title only. The note keeps its ``created``, ``updated`` and
+    capture dates, so an unchanged note comes back byte for byte.
+    """
+    path = ROOT / rel_path
+    text = path.read_text(encoding="utf-8")
+    entry = read_note_entry(group, path)
+    snapshot = SNAPSHOTS.get(entry.source_url) if entry else None
+    if entry is None or snapshot is None:
+        return None
+    cited: List[Tuple[str, str]] = []
+    section = ""
+    for line in text.splitlines():
+        if line.startswith("## "):
+            section = line[3:].strip()
+        elif section == "Bibliography":
+            match = BIBLIOGRAPHY_LINE_RE.match(line)
+            if match:
+                cited.append((match["title"], match["url"]))
+    # snapshots are shared by every spelling of a URL; the note keeps the one it cites
+    records = [replace(snapshot.record, url=entry.source_url)]
+    for title, url in cited[1:]:
+        found = SNAPSHOTS.get(url)
+        records.append(replace(found.record, url=url) if found else SourceRecord(url, title, "", [], [], [], False, None))
+
+    # ingest fingerprints the topic's slug, which is the note's directory name
+    topic_id = path.parent.name if entry.kind == "topic" else ""
+    bibliography = build_bibliography(records, 0)
+    fingerprint = note_fingerprint(records, group, entry.level, entry.title, entry.kind, topic_id, json.dumps(bibliography))
+    content = build_note_content(
+        cfg=GROUPS[group],
+        title=entry.title,
+        level=entry.level,
+        primary=records[0],
+        bibliography=bibliography,
+        kind=entry.kind,
+        topic_id=topic_id,
+        corroborating=records[1:],
+        fingerprint=fingerprint,
+    )
+    fields = parse_frontmatter(text)
+    captured = CAPTURED_RE.search(text)
+    content = FRONTMATTER_CREATED_RE.sub(f"created: {fields.get('created', TODAY)}", content, count=1)
+    content = FRONTMATTER_UPDATED_RE.sub(f"updated: {fields.get('updated', TODAY)}", content, count=1)
+    return CAPTURED_RE.sub(f"Captured on {captured['date'] if captured else TODAY}.", content, count=1)
+
+
+def resynthesize_notes(jobs: List[Tuple[str, str]]) -> List[Tuple[str, str, Optional[str]]]:
+    """Worker-process entry point: (rel path, outcome, new content when changed) per (group, rel path) job."""
+    results: List[Tuple[str, str, Optional[str]]] = []
+    for group, rel_path in jobs:
+        try:
+            content = resynthesize_note(group, rel_path)
+        except (OSError, UnicodeDecodeError, ValueError, zlib.error) as exc:
+            results.append((rel_path, f"failed: {exc}", None))
+            continue
+        if content is None:
+            results.append((rel_path, "missing", None))
+        elif content == (ROOT / rel_path).read_text(encoding="utf-8"):
+            results.append((rel_path, "unchanged", None))
+        else:
+            results.append((rel_path, "rewritten", content))
+    return results
+
+
+def run_resynthesize(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="add_knowledge_from_url.py resynthesize",
+        description="Regenerate every knowledge note from the snapshot pack, without touching the network.",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (default: one per CPU)."
+    )
+    parser.add_argument("--chunk-size", type=int, default=32, help="Notes handed to a worker at a time (default: 32).")
+    parser.add_argument("--dry-run", action="store_true", help="Only list the notes that would change.")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    jobs = [
+        (group, path.relative_to(ROOT).as_posix())
+        for group, cfg in GROUPS.items()
+        for path in sorted((ROOT / cfg.knowledge_dir).glob("*/README.md"))
+    ]
+    chunks = [jobs[start : start + max(args.chunk_size, 1)] for start in range(0, len(jobs), max(args.chunk_size, 1))]
+    counts = {"rewritten": 0, "unchanged": 0, "missing": 0, "failed": 0}
+    # the lock keeps ingestors from rewriting a note between its synthesis and the write
+    with VAULT.lock():
+        pool: Optional[ProcessPoolExecutor] = None
+        if args.workers > 1 and len(chunks) > 1:
+            pool = ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("spawn"))
+        try:
+            for results in (pool.map if pool else map)(resynthesize_notes, chunks):
+                for rel_path, outcome, content in results:
+                    counts[outcome.split(":", 1)[0]] += 1
+                    if content is not None:
+                        print(f"{'Would rewrite' if args.dry_run else 'Rewrote'}: {rel_path}")
+                        if not args.dry_run:
+                            VAULT.write_note(ROOT / rel_path, touch_updated(content))
+                    elif outcome.startswith("failed"):
+                        print(f"warning={rel_path} {outcome}")
+        finally:
+            if pool:
+                pool.shutdown(cancel_futures=True)
+    if not args.dry_run:
+        SEARCH_INDEX.flush()
+        SIMILARITY_INDEX.flush()
+        CENTROIDS.flush()
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"Resynthesized {len(jobs)} notes in {elapsed:.2f}s - {counts['rewritten']} changed, "
+        f"{counts['unchanged']} unchanged, {counts['missing']} without a snapshot, {counts['failed']} failed"
+    )
+    return 1 if counts["failed"] else 0
+
+
+COMMANDS = {
+    "batch": run_batch,
+    "watch": run_watch,
+    "search": run_search,
+    "rebuild": run_rebuild,
+    "resynthesize": run_resynthesize,
+}
+
 
-    action = "Updated" if existed_before else "Created"
-    print(f"{action}: {note_path.relative_to(ROOT)}")
+def main() -> int:
+    argv = sys.argv[1:]
+    if argv and argv[0] in COMMANDS:
+        return COMMANDS[argv[0]](argv[1:])
+
+    args = parse_args(argv)
+    try:
+        validate_args(args)
+    except ValueError as exc:
+        print(f"Error: {exc}")
+        return 1
+
+    fetcher = configure_run(args)
+    try:
+        with TRACER.span("ingest", url=args.url):
+            result = ingest(args, fetcher, on_duplicate=ask_duplicate if sys.stdin.isatty() else None)
+    except ValueError as exc:
+        print(f"Error: {exc}")
+        return 2
+    except OfflineMissError as exc:
+        print(f"Error: {exc.reason}")
+        return 2
+    finally:
+        finish_run(fetcher)
+
+    if args.dry_run:
+        for warning in result.warnings:
+            print(f"warning={warning}")
+        print(f"group={result.group}")
+        print(f"level={result.level}")
+        print(f"kind={result.kind}")
+        print(f"target={result.note_path.relative_to(ROOT)}")
+        print(f"citations={result.citations}")
+        return 0
+
+    cfg = GROUPS[result.group]
+    for warning in result.warnings:
+        print(f"warning={warning}")
+    if result.action == "Skipped":
+        print(f"Skipped: {result.note_path.relative_to(ROOT)} (sources unchanged)")
+        return 0
+    if result.action == "Duplicate":
+        print(f"Skipped: duplicate of {result.note_path.relative_to(ROOT)}")
+        return 0
+    print(f"{result.action}: {result.note_path.relative_to(ROOT)}")
     print(f"Updated: {cfg.knowledge_index.as_posix()}")
-    print(f"Group: {group} | Level: {level} | Kind: {args.kind} | Citations: {len(bibliography)}")
+    print(f"Group: {result.group} | Level: {result.level} | Kind: {result.kind} | Citations: {result.citations}")
     return 0
 
 
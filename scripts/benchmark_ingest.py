@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""Benchmark the CPU-bound stages of the ingest pipeline on synthetic data.
+
+Generates large HTML pages, sentence pools and Knowledge Indexes with thousands of entries
+in a scratch vault, then times each stage and reports throughput, latency percentiles and
+peak traced memory as JSON. No network access and no writes outside the scratch directory.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import add_knowledge_from_url as ingest_module
+from add_knowledge_from_url import (
+    GROUP_KEYWORDS,
+    GROUPS,
+    LEVEL_KEYWORDS,
+    NOISE_PATTERNS,
+    PageParser,
+    SentencePool,
+    SourceIndex,
+    SourceRecord,
+    TextBlocks,
+    VaultWriter,
+    classify_group,
+    classify_level,
+    classify_texts,
+    extract_content_sentences,
+    find_existing_entry_by_source,
+    pick_distinct_sentences,
+    sentence_signature,
+    upsert_knowledge_index_entry,
+)
+
+TOPIC_WORDS = (
+    "model training inference cluster scheduler kernel memory bandwidth latency throughput "
+    "pipeline dataset evaluation benchmark gradient optimizer tensor compiler runtime network "
+    "storage checkpoint sharding replica partition token context retrieval embedding vector "
+    "search ranking planner executor workflow message queue cache eviction compression format"
+).split()
+KEYWORDS = [word for table in (GROUP_KEYWORDS, LEVEL_KEYWORDS) for words in table.values() for word in words]
+
+
+def make_vocabulary(rng: random.Random, size: int = 20000) -> List[str]:
+    """Topic words followed by pseudo-words; sampled by rank with Zipf weights like real prose."""
+    letters = "etaoinshrdlcumwfgypbvkjxqz"
+    vocabulary = list(TOPIC_WORDS)
+    while len(vocabulary) < size:
+        vocabulary.append("".join(rng.choices(letters, weights=range(26, 0, -1), k=rng.randint(3, 10))))
+    return vocabulary
+
+
+VOCABULARY = make_vocabulary(random.Random(0))
+ZIPF_CUMULATIVE = list(itertools.accumulate(1 / rank for rank in range(1, len(VOCABULARY) + 1)))
+
+
+def make_words(rng: random.Random, count: int) -> List[str]:
+    return rng.choices(VOCABULARY, cum_weights=ZIPF_CUMULATIVE, k=count)
+
+
+def make_sentence(rng: random.Random, words: int = 18) -> str:
+    tokens = make_words(rng, words)
+    for _ in range(rng.randint(0, 2)):
+        tokens.insert(rng.randrange(len(tokens)), rng.choice(KEYWORDS))
+    return " ".join(tokens).capitalize() + "."
+
+
+def make_sentence_pool(rng: random.Random, count: int, duplicate_rate: float = 0.2) -> List[str]:
+    """Sentences where roughly ``duplicate_rate`` are near-copies (one word swapped) of earlier ones."""
+    pool: List[str] = []
+    for _ in range(count):
+        if pool and rng.random() < duplicate_rate:
+            tokens = rng.choice(pool).rstrip(".").split()
+            tokens[rng.randrange(len(tokens))] = make_words(rng, 1)[0]
+            pool.append(" ".join(tokens) + ".")
+        else:
+            pool.append(make_sentence(rng))
+    return pool
+
+
+def make_page(rng: random.Random, target_bytes: int) -> str:
+    parts = [
+        "<!doctype html><html><head>",
+        f"<title>{make_sentence(rng, 6)}</title>",
+        f'<meta name="description" content="{make_sentence(rng)}">',
+        "</head><body><nav><ul>",
+        *(f'<li><a href="/{word}">{word}</a></li>' for word in TOPIC_WORDS[:12]),
+        "</ul></nav><main>",
+    ]
+    size = sum(len(part) for part in parts)
+    while size < target_bytes:
+        roll = rng.random()
+        if roll < 0.1:
+            part = f"<h2>{make_sentence(rng, 5)}</h2>"
+        elif roll < 0.65:
+            sentences = " ".join(make_sentence(rng) for _ in range(rng.randint(2, 5)))
+            part = f'<p class="body">{sentences} <a href="#x">more</a></p>'
+        elif roll < 0.9:
+            part = "<ul>" + "".join(f"<li>{make_sentence(rng, 10)}</li>" for _ in range(4)) + "</ul>"
+        elif roll < 0.95:
+            part = f"<p>{rng.choice(NOISE_PATTERNS).capitalize()} to continue.</p>"
+        else:
+            part = '<div class="ad"><script>var x = {"k": [1, 2, 3]};</script></div>'
+        parts.append(part)
+        size += len(part)
+    parts.append("</main><footer><p>Privacy policy and cookie settings.</p></footer></body></html>")
+    return "".join(parts)
+
+
+def make_vault(root: Path, rng: random.Random, entries: int) -> List[str]:
+    """Write Knowledge Indexes holding ``entries`` lines spread across groups; returns their source URLs."""
+    sources: List[str] = []
+    groups = list(GROUPS.items())
+    lines: Dict[str, List[str]] = {group: [] for group, _ in groups}
+    for position in range(entries):
+        group, cfg = groups[position % len(groups)]
+        source = f"https://example.org/{group}/{position}-{rng.choice(TOPIC_WORDS)}"
+        level = rng.choice(list(LEVEL_KEYWORDS))
+        lines[group].append(
+            f"- [ ] [Entry {position}](entry-{position}/README.md) - level: {level} "
+            f"- source: {source} - citations: {rng.randint(1, 9)}"
+        )
+        sources.append(source)
+    for group, cfg in groups:
+        index_path = root / cfg.knowledge_index
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        header = ["---", "tags: [knowledge, index]", "---", "", f"# {group.title()} Knowledge Index", "", "## Entries", ""]
+        index_path.write_text("\n".join(header + lines[group]) + "\n", encoding="utf-8")
+    return sources
+
+
+def parse_page(html: str) -> PageParser:
+    parser = PageParser()
+    parser.feed(html)
+    parser.close()
+    return parser
+
+
+def retained_bytes(build: Callable[[], List[object]]) -> float:
+    """Traced memory still held by the objects ``build`` returns, per object."""
+    tracemalloc.start()
+    try:
+        objects = build()
+        retained = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return round(retained / max(len(objects), 1), 1)
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def measure(
+    calls: Sequence[Callable[[], object]],
+    volume: Optional[int] = None,
+    setup: Optional[Callable[[], None]] = None,
+    memory: bool = True,
+) -> Dict[str, object]:
+    """Time each call, then (optionally) repeat the pass under tracemalloc for the peak."""
+    if setup:
+        setup()
+    latencies: List[float] = []
+    started = time.perf_counter()
+    for call in calls:
+        t0 = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - t0)
+    total = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    report: Dict[str, object] = {
+        "calls": len(calls),
+        "total_s": round(total, 6),
+        "ops_per_s": round(len(calls) / total, 2) if total else None,
+        "latency_ms": {
+            name: round(percentile(ordered, fraction) * 1000, 4)
+            for name, fraction in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("max", 1.0))
+        },
+    }
+    if volume is not None:
+        report["mb_per_s"] = round(volume / total / 1e6, 3) if total else None
+    if memory:
+        # tracing slows allocation-heavy code down, so the peak comes from a separate pass
+        if setup:
+            setup()
+        tracemalloc.start()
+        try:
+            for call in calls:
+                call()
+            report["peak_kib"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        finally:
+            tracemalloc.stop()
+    return report
+
+
+def run(args: argparse.Namespace) -> Dict[str, object]:
+    rng = random.Random(args.seed)
+    stages: Dict[str, Dict[str, object]] = {}
+    memory = not args.no_memory
+    selected = set(args.stages) if args.stages else None
+
+    def wanted(name: str) -> bool:
+        return selected is None or name in selected
+
+    if any(wanted(name) for name in ("page_parse", "extract_content_sentences", "classify", "classify_batch", "source_record")):
+        pages = [make_page(rng, args.page_kb * 1024) for _ in range(args.pages)]
+        parsed = [parse_page(html) for html in pages]
+        if wanted("page_parse"):
+            calls = [lambda html=html: parse_page(html) for html in pages]
+            stages["page_parse"] = measure(calls, volume=sum(len(html.encode("utf-8")) for html in pages), memory=memory)
+        if wanted("extract_content_sentences"):
+            calls = [lambda p=p: extract_content_sentences(p.description, p.paragraphs, p.list_items) for p in parsed]
+            stages["extract_content_sentences"] = measure(calls, memory=memory)
+        if wanted("classify"):
+            texts = ["\n".join([p.title, p.description, *p.headings, *p.paragraphs]) for p in parsed]
+            calls = [lambda text=text: (classify_group(text), classify_level(text)) for text in texts]
+            stages["classify"] = measure(calls, volume=sum(len(text) for text in texts), memory=memory)
+        if wanted("classify_batch"):
+            texts = ["\n".join([p.title, p.description, *p.headings, *p.paragraphs]) for p in parsed]
+            calls = [lambda: classify_texts(texts)]
+            stages["classify_batch"] = measure(calls, volume=sum(len(text) for text in texts), memory=memory)
+
+        if wanted("source_record"):
+            # fresh copies of the parsed text, as a fetch would allocate them
+            fields = json.dumps([[p.title, p.description, p.headings, p.paragraphs, p.list_items] for p in parsed])
+
+            def as_lists() -> List[object]:
+                return [tuple(page) for page in json.loads(fields)]
+
+            def as_records() -> List[object]:
+                return [SourceRecord(f"https://example.com/{n}", *page, False, None) for n, page in enumerate(json.loads(fields))]
+
+            def as_synthesized() -> List[object]:
+                # sentences are only on records a parse worker or a note has extracted them for
+                records = as_records()
+                for record in records:
+                    record.sentences = TextBlocks(extract_content_sentences(record.description, record.paragraphs, record.list_items))  # type: ignore[attr-defined]
+                return records
+
+            def as_dropped() -> List[object]:
+                records = as_synthesized()
+                for record in records:
+                    record.drop_blocks()  # type: ignore[attr-defined]
+                return records
+
+            calls = [lambda page=page: SourceRecord("https://example.com/", *page, False, None) for page in json.loads(fields)]
+            stages["source_record"] = measure(calls, memory=memory)
+            stages["source_record"]["bytes_per_record"] = {
+                "lists": retained_bytes(as_lists),
+                "compact": retained_bytes(as_records),
+                "with_sentences": retained_bytes(as_synthesized),
+                "blocks_dropped": retained_bytes(as_dropped),
+            }
+
+    if wanted("sentence_pool") or wanted("pick_distinct_sentences"):
+        pools = [make_sentence_pool(rng, args.pool_size) for _ in range(args.pools)]
+        if wanted("sentence_pool"):
+            calls = [lambda pool=pool: SentencePool().extend(pool) for pool in pools]
+            stages["sentence_pool"] = measure(calls, volume=sum(len(s) for pool in pools for s in pool), memory=memory)
+        if wanted("pick_distinct_sentences"):
+            signed = [(pool, [sentence_signature(s) for s in pool]) for pool in pools]
+            calls = [lambda pool=pool, sigs=sigs: pick_distinct_sentences(pool, 18, sigs) for pool, sigs in signed]
+            stages["pick_distinct_sentences"] = measure(calls, memory=memory)
+
+    index_stages = {"source_index_build", "find_existing_entry_by_source", "upsert_knowledge_index_entry", "index_flush"}
+    if any(wanted(name) for name in index_stages):
+        with tempfile.TemporaryDirectory(prefix="ingest-bench-") as scratch:
+            stages.update(run_index_stages(Path(scratch), rng, args, wanted, memory))
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {key: value for key, value in vars(args).items() if key != "output"},
+        "stages": stages,
+    }
+
+
+def run_index_stages(
+    root: Path, rng: random.Random, args: argparse.Namespace, wanted: Callable[[str], bool], memory: bool
+) -> Dict[str, Dict[str, object]]:
+    """Index stages run against a scratch vault by pointing the ingest module's globals at it."""
+    stages: Dict[str, Dict[str, object]] = {}
+    saved = (ingest_module.ROOT, ingest_module.SOURCE_INDEX, ingest_module.VAULT)
+    ingest_module.ROOT = root
+    ingest_module.VAULT = VaultWriter(root / ".cache" / "vault.lock")
+    try:
+        sources = make_vault(root, rng, args.index_entries)
+
+        def fresh_index() -> None:
+            ingest_module._INDEX_LINES_CACHE.clear()
+            ingest_module.SOURCE_INDEX = SourceIndex(root / ".cache" / "source_index.json")
+
+        if wanted("source_index_build"):
+            stages["source_index_build"] = measure(
+                [lambda: ingest_module.SOURCE_INDEX.rebuild()], setup=fresh_index, memory=memory
+            )
+
+        fresh_index()
+        ingest_module.SOURCE_INDEX.rebuild()
+        misses = [f"https://example.net/missing/{position}" for position in range(args.lookups // 4)]
+        targets = [rng.choice(sources) for _ in range(args.lookups - len(misses))] + misses
+        rng.shuffle(targets)
+        if wanted("find_existing_entry_by_source"):
+            calls = [lambda url=url: find_existing_entry_by_source(url) for url in targets]
+            stages["find_existing_entry_by_source"] = measure(calls, memory=memory)
+
+        groups = list(GROUPS.items())
+        upserts = []
+        for position in range(args.upserts):
+            group, cfg = groups[position % len(groups)]
+            # half replace existing entries, half append new ones
+            source = rng.choice(sources) if position % 2 else f"https://example.net/new/{position}"
+            upserts.append((cfg, f"Upserted {position}", root / cfg.knowledge_dir / f"upserted-{position}", source))
+        if wanted("upsert_knowledge_index_entry"):
+            calls = [
+                lambda cfg=cfg, title=title, note_dir=note_dir, source=source: upsert_knowledge_index_entry(
+                    cfg=cfg, title=title, note_dir=note_dir, level="intermediate", source_url=source, citations_count=3
+                )
+                for cfg, title, note_dir, source in upserts
+            ]
+            stages["upsert_knowledge_index_entry"] = measure(calls, memory=memory)
+        if wanted("index_flush"):
+
+            def queue_upserts() -> None:
+                for cfg, title, note_dir, source in upserts:
+                    upsert_knowledge_index_entry(cfg, title, note_dir, "intermediate", source, 3)
+
+            stages["index_flush"] = measure([ingest_module.VAULT.flush], setup=queue_upserts, memory=memory)
+    finally:
+        ingest_module.ROOT, ingest_module.SOURCE_INDEX, ingest_module.VAULT = saved
+        ingest_module._INDEX_LINES_CACHE.clear()
+    return stages
+
+
+STAGES = (
+    "page_parse",
+    "extract_content_sentences",
+    "sentence_pool",
+    "pick_distinct_sentences",
+    "classify",
+    "classify_batch",
+    "source_record",
+    "source_index_build",
+    "find_existing_entry_by_source",
+    "upsert_knowledge_index_entry",
+    "index_flush",
+)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark ingest pipeline stages on synthetic data.")
+    parser.add_argument("--pages", type=int, default=20, help="Synthetic HTML pages (default: 20).")
+    parser.add_argument("--page-kb", type=int, default=512, help="Approximate size of each page in KiB (default: 512).")
+    parser.add_argument("--pools", type=int, default=5, help="Synthetic sentence pools (default: 5).")
+    parser.add_argument("--pool-size", type=int, default=5000, help="Sentences per pool (default: 5000).")
+    parser.add_argument("--index-entries", type=int, default=10000, help="Knowledge Index entries across groups (default: 10000).")
+    parser.add_argument("--lookups", type=int, default=5000, help="Source lookups, a quarter of them misses (default: 5000).")
+    parser.add_argument("--upserts", type=int, default=1000, help="Index upserts, half of them replacements (default: 1000).")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=None, help="Only run these stages.")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for the generators (default: 1).")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass.")
+    parser.add_argument("--output", type=Path, default=None, help="Write the JSON report here instead of stdout.")
+    return parser.parse_args(argv)
+
+
+def main() -> int:
+    args = parse_args()
+    report = run(args)
+    payload = json.dumps(report, indent=2, default=str)
+    if args.output:
+        args.output.write_text(payload + "\n", encoding="utf-8")
+    else:
+        sys.stdout.write(payload + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""Serve recorded ingest fixtures over HTTP as a stand-in for the live sites.
+
+Responses captured with ``add_knowledge_from_url.py --record`` are replayed for requests of the
+form ``GET /fetch?url=<encoded source URL>``, which is what ``--fixture-server`` sends. Latency,
+bandwidth throttling and error injection make it possible to time the pipeline under realistic
+(or hostile) network conditions without leaving the machine.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import socket
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import List, Optional
+
+from add_knowledge_from_url import FIXTURES, FixtureStore
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "FixtureServer"
+
+    def log_message(self, format: str, *args: object) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self) -> None:
+        parsed = urllib.parse.urlsplit(self.path)
+        url = urllib.parse.parse_qs(parsed.query).get("url", [""])[0]
+        if parsed.path != "/fetch" or not url:
+            self.send_plain(400, "expected /fetch?url=<source url>\n")
+            return
+
+        self.server.delay()
+        error = self.server.pick_error()
+        if error == "drop":
+            # close without a response, like a reset connection
+            self.connection.shutdown(socket.SHUT_RDWR)
+            self.close_connection = True
+            return
+        if error is not None:
+            self.send_plain(int(error), f"injected HTTP {error}\n", retry_after=True)
+            return
+
+        fixture = self.server.store.load(url)
+        if fixture is None:
+            self.send_plain(404, f"no fixture for {url}\n")
+            return
+        status, headers, body = fixture
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.server.write_throttled(self.wfile, body)
+
+    def send_plain(self, status: int, text: str, retry_after: bool = False) -> None:
+        body = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if retry_after:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple,
+        store: FixtureStore,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        bandwidth: Optional[float] = None,
+        error_rate: float = 0.0,
+        errors: Optional[List[str]] = None,
+        seed: Optional[int] = None,
+        verbose: bool = False,
+    ) -> None:
+        super().__init__(address, FixtureHandler)
+        self.store = store
+        self.latency = latency
+        self.jitter = jitter
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.errors = errors or ["503"]
+        self.verbose = verbose
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self) -> None:
+        with self._lock:
+            seconds = self.latency + self._random.uniform(0, self.jitter)
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def pick_error(self) -> Optional[str]:
+        with self._lock:
+            if self.error_rate <= 0 or self._random.random() >= self.error_rate:
+                return None
+            return self._random.choice(self.errors)
+
+    def write_throttled(self, wfile, body: bytes, chunk_size: int = 16 * 1024) -> None:  # type: ignore[no-untyped-def]
+        if not self.bandwidth:
+            wfile.write(body)
+            return
+        for start in range(0, len(body), chunk_size):
+            chunk = body[start : start + chunk_size]
+            wfile.write(chunk)
+            time.sleep(len(chunk) / self.bandwidth)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Replay recorded ingest fixtures over HTTP.")
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES.root, help="Fixture directory (default: .cache/fixtures).")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1).")
+    parser.add_argument("--port", type=int, default=8900, help="Port (default: 8900).")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before every response.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency of up to this many seconds.")
+    parser.add_argument("--bandwidth", type=float, default=None, help="Throttle bodies to this many KiB/s per response.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with an injected error.")
+    parser.add_argument(
+        "--errors",
+        default="503",
+        help="Comma-separated injected errors: HTTP status codes or 'drop' to close the connection (default: 503).",
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for jitter and error injection.")
+    parser.add_argument("--verbose", action="store_true", help="Log every request.")
+    return parser.parse_args(argv)
+
+
+def main() -> int:
+    args = parse_args()
+    errors = [error.strip() for error in args.errors.split(",") if error.strip()]
+    for error in errors:
+        if error != "drop" and not error.isdigit():
+            print(f"Error: --errors entries must be status codes or 'drop', got {error!r}")
+            return 1
+    if not args.fixtures.is_dir():
+        print(f"Error: fixture directory not found: {args.fixtures}")
+        return 1
+
+    server = FixtureServer(
+        (args.host, args.port),
+        FixtureStore(args.fixtures),
+        latency=args.latency,
+        jitter=args.jitter,
+        bandwidth=args.bandwidth * 1024 if args.bandwidth else None,
+        error_rate=args.error_rate,
+        errors=errors,
+        seed=args.seed,
+        verbose=args.verbose,
+    )
+    fixtures = len(list(args.fixtures.glob("*.json")))
+    print(f"Serving {fixtures} fixtures from {args.fixtures} on http://{args.host}:{server.server_port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
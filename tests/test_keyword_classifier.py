@@ -0,0 +1,61 @@
+import random
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+from add_knowledge_from_url import GROUP_KEYWORDS, LEVEL_KEYWORDS, KeywordClassifier  # noqa: E402
+
+
+def reference_scores(tables, text):
+    """One ``str.count`` (or non-overlapping whole-word ``findall``) per keyword."""
+    haystack = text.lower()
+    scores = {}
+    for table, entries in tables.items():
+        scores[table] = {}
+        for label, keywords in entries.items():
+            specs = keywords if isinstance(keywords, dict) else {kw: 1.0 for kw in keywords}
+            total = 0.0
+            for keyword, spec in specs.items():
+                weight, whole_word = (spec.get("weight", 1.0), spec.get("whole_word", False)) if isinstance(spec, dict) else (spec, False)
+                if whole_word:
+                    hits = len(re.findall(r"(?<!\w)" + re.escape(keyword.lower()) + r"(?!\w)", haystack))
+                else:
+                    hits = haystack.count(keyword.lower())
+                total += weight * hits
+            scores[table][label] = total
+    return scores
+
+
+def assert_parity(tables, texts):
+    classifier = KeywordClassifier(tables, {table: next(iter(entries)) for table, entries in tables.items()})
+    for text in texts:
+        assert classifier.scores(text) == reference_scores(tables, text), text
+
+
+def test_overlapping_keywords_count_like_str_count():
+    tables = {"group": {"x": ["aa", "ana"], "y": ["a", "aaa"]}}
+    assert KeywordClassifier(tables, {"group": "x"}).scores("aaa banana")["group"]["x"] == 2
+    assert_parity(tables, ["aaa banana", "aaaa", "anana bananana", "a aa aaa aaaa"])
+
+
+def test_prefix_and_whole_word_keywords_match_reference():
+    tables = {
+        "group": {
+            "x": {"ab": 1.0, "abab": 2.0, "a-a": {"whole_word": True}},
+            "y": {"aba": {"weight": 3, "whole_word": True}, "b": 0.5},
+        }
+    }
+    rng = random.Random(7)
+    texts = ["".join(rng.choice("ab- ") for _ in range(rng.randint(0, 40))) for _ in range(500)]
+    assert_parity(tables, ["a-a-a", "ababab aba", "aba, abab_aba", *texts])
+
+
+def test_default_tables_match_reference():
+    tables = {"group": GROUP_KEYWORDS, "level": LEVEL_KEYWORDS}
+    text = (
+        "Scaling LLM agents on GPU clusters: a beginner-friendly introduction to multi-agent planning, "
+        "retrieval-augmented generation and advanced MPI tuning for supercomputing workloads."
+    )
+    assert_parity(tables, [text, text.upper(), text * 3])